@@ -0,0 +1,183 @@
+import argparse
+import json
+import random
+import sys
+import time
+import numpy as np
+from hangman_v4 import HangmanSolver
+
+BENCH_CORPUS_VERSION = 1
+BENCH_CORPUS_SEED = 20240601
+STAGES = ["split", "filter", "single", "eig", "affix", "oov", "total"]
+# rough English letter frequencies, used to pick plausible guessed letters
+GUESS_ORDER = "etaoinsrhldcumfpgwybvkxjqz"
+
+def word_count_bucket(n):
+    return "1" if n == 1 else "2" if n == 2 else "3-4" if n <= 4 else "5+"
+
+def length_bucket(n):
+    return "1-4" if n <= 4 else "5-7" if n <= 7 else "8-10" if n <= 10 else "11+"
+
+def oov_bucket(rate):
+    return "0" if rate == 0 else "<=50%" if rate <= 0.5 else ">50%"
+
+def make_state(phrase, rng):
+    """A mid-game state of `phrase`: some guessed letters revealed, misses counted."""
+    depth = rng.randint(0, 8)
+    weights = [len(GUESS_ORDER) - i for i in range(len(GUESS_ORDER))]
+    guessed = []
+    while len(guessed) < depth:
+        letter = rng.choices(GUESS_ORDER, weights)[0]
+        if letter not in guessed:
+            guessed.append(letter)
+    misses = sum(1 for g in guessed if g not in phrase)
+    pattern = "".join(c if c == " " or c in guessed else "_" for c in phrase)
+    if misses >= 6 or "_" not in pattern:
+        return None
+    return {"currentWordState": pattern, "guessedLetters": guessed, "guessesRemaining": 6 - misses}
+
+def build_corpus(solver, phrases_path, words_path, per_stratum):
+    """
+    Sample hidden words/phrases from the data files, stratified by phrase word
+    count, longest word length and share of out-of-dictionary words, and turn
+    each into one game state.
+    """
+    vocabulary = set(solver.word_list)
+    candidates = set()
+    for path in (phrases_path, words_path):
+        with open(path, "r", encoding="utf-8") as f:
+            candidates |= {" ".join(line.lower().split()) for line in f if line.strip()}
+
+    strata = {}
+    for phrase in sorted(candidates):
+        words = phrase.split(" ")
+        if not all(w.isascii() and w.isalpha() for w in words):
+            continue
+        oov_rate = sum(w not in vocabulary for w in words) / len(words)
+        key = (word_count_bucket(len(words)), length_bucket(max(map(len, words))), oov_bucket(oov_rate))
+        strata.setdefault(key, []).append(phrase)
+
+    rng = random.Random(BENCH_CORPUS_SEED)
+    entries = []
+    for key in sorted(strata):
+        for phrase in rng.sample(strata[key], min(per_stratum, len(strata[key]))):
+            state = make_state(phrase, rng)
+            if state:
+                state.update(hiddenWord=phrase, words=key[0], length=key[1], oov=key[2])
+                entries.append(state)
+    return entries
+
+def time_stages(solver, state):
+    """Nanoseconds spent in each stage of get_next_guess for one state."""
+    timings = {}
+    guessed = solver._normalize_guessed(state["guessedLetters"])
+    clock = time.perf_counter_ns
+
+    t = clock()
+    words_state = solver._split_state(state["currentWordState"])
+    timings["split"] = clock() - t
+
+    # the id filter get_next_guess runs (filter_candidates_one_word also
+    # decodes the candidates into strings)
+    t = clock()
+    per_word = [(wpat, solver.dictionary.filter_ids(wpat, guessed)) for wpat in words_state]
+    timings["filter"] = clock() - t
+
+    t = clock()
+    solver._single_candidate_letter(per_word, guessed)
+    timings["single"] = clock() - t
+
+    constrained = solver._constrained_words(per_word)
+    if constrained:
+        _, wpat, ids = min(constrained, key=lambda c: len(c[2]))
+        t = clock()
+        solver._eig_letter_for_word(wpat, solver.dictionary.matrix(len(wpat))[ids], guessed)
+        timings["eig"] = clock() - t
+
+    # affix bonuses are cached per pattern; time the uncached computation
+    solver._affix_cache.clear()
+    t = clock()
+    for wpat in words_state:
+        solver._affix_bonus("e", wpat)
+    timings["affix"] = clock() - t
+
+    solver._affix_cache.clear()
+    t = clock()
+    solver._oov_score_letter_for_phrase(words_state, guessed)
+    timings["oov"] = clock() - t
+
+    solver.reset()
+    t = clock()
+    solver.get_next_guess(state["currentWordState"], state["guessedLetters"], state["guessesRemaining"])
+    timings["total"] = clock() - t
+    return timings
+
+def percentile_rows(samples):
+    """stage -> {"n", "p50", "p95", "p99"}, latencies in microseconds."""
+    rows = {}
+    for stage in STAGES:
+        values = np.array(samples.get(stage, []), dtype=np.float64) / 1000.0
+        if len(values):
+            p50, p95, p99 = np.percentile(values, [50, 95, 99])
+            rows[stage] = {"n": len(values), "p50": p50, "p95": p95, "p99": p99}
+    return rows
+
+def print_table(title, rows):
+    print(f"\n{title}")
+    print(f"{'stage':<8}{'n':>7}{'p50 us':>12}{'p95 us':>12}{'p99 us':>12}")
+    for stage, row in rows.items():
+        print(f"{stage:<8}{row['n']:>7}{row['p50']:>12.1f}{row['p95']:>12.1f}{row['p99']:>12.1f}")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dict", "-d", type=str, required=True, help="Airline dictionary path")
+    parser.add_argument("--corpus", "-c", type=str, default=f"data/bench_corpus_v{BENCH_CORPUS_VERSION}.json",
+                        help="Benchmark corpus (built with --rebuild-corpus)")
+    parser.add_argument("--rebuild-corpus", action="store_true", help="Sample the corpus again from the data files")
+    parser.add_argument("--phrases", type=str, default="data/airlines_cleaned.txt", help="Phrases to sample from")
+    parser.add_argument("--per-stratum", type=int, default=25, help="States sampled per stratum")
+    parser.add_argument("--repeat", "-r", type=int, default=3, help="Timed runs per state")
+    parser.add_argument("--by", choices=["words", "length", "oov"], default="words",
+                        help="Also report percentiles per stratum of this kind")
+    parser.add_argument("--json", type=str, default=None, help="Write the percentiles here as JSON")
+    args = parser.parse_args()
+
+    solver = HangmanSolver(airline_dict_path=args.dict)
+
+    if args.rebuild_corpus:
+        entries = build_corpus(solver, args.phrases, args.dict, args.per_stratum)
+        with open(args.corpus, "w", encoding="utf-8") as f:
+            # one state per line keeps corpus changes readable in diffs
+            f.write(f'{{"version": {BENCH_CORPUS_VERSION}, "seed": {BENCH_CORPUS_SEED}, "states": [\n')
+            f.write(",\n".join(json.dumps(entry) for entry in entries))
+            f.write("\n]}\n")
+        print(f"Wrote {len(entries)} states to {args.corpus}", file=sys.stderr)
+
+    with open(args.corpus, "r", encoding="utf-8") as f:
+        corpus = json.load(f)
+    if corpus.get("version") != BENCH_CORPUS_VERSION:
+        sys.exit(f"{args.corpus} is not a version {BENCH_CORPUS_VERSION} corpus; rerun with --rebuild-corpus")
+    states = corpus["states"]
+
+    overall = {}
+    by_group = {}
+    for state in states:
+        group = by_group.setdefault(state[args.by], {})
+        for _ in range(args.repeat):
+            for stage, ns in time_stages(solver, state).items():
+                overall.setdefault(stage, []).append(ns)
+                group.setdefault(stage, []).append(ns)
+
+    report = {"corpusVersion": BENCH_CORPUS_VERSION, "states": len(states), "overall": percentile_rows(overall)}
+    print_table(f"All {len(states)} states x {args.repeat} runs", report["overall"])
+    report[args.by] = {}
+    for key in sorted(by_group):
+        report[args.by][key] = percentile_rows(by_group[key])
+        print_table(f"{args.by} = {key}", report[args.by][key])
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == "__main__":
+    main()
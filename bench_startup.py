@@ -0,0 +1,60 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Runs in a fresh interpreter for every repetition, so imports are always cold
+PROBE = """
+import json, sys, time
+t0 = time.perf_counter()
+from hangman_v4 import HangmanSolver
+t1 = time.perf_counter()
+solver = HangmanSolver(**json.loads(sys.argv[1]))
+t2 = time.perf_counter()
+print(json.dumps({"import": t1 - t0, "construct": t2 - t1, "nltk": "nltk" in sys.modules}))
+"""
+
+def time_startup(solver_kwargs, repeat):
+    """Import and construction seconds of `repeat` fresh solver processes."""
+    runs = []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-c", PROBE, json.dumps(solver_kwargs)],
+                             cwd=HERE, capture_output=True, text=True, check=True)
+        runs.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    return runs
+
+def report(name, runs):
+    imports = [r["import"] for r in runs]
+    constructs = [r["construct"] for r in runs]
+    nltk_loaded = any(r["nltk"] for r in runs)
+    print(f"{name:<12} import {statistics.median(imports) * 1000:7.1f} ms (min {min(imports) * 1000:.1f})  "
+          f"construct {statistics.median(constructs) * 1000:7.1f} ms (min {min(constructs) * 1000:.1f})"
+          f"{'  [nltk imported]' if nltk_loaded else ''}")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dict", "-d", type=str, required=True, help="Airline dictionary path")
+    parser.add_argument("--words", "-w", type=str, default=None, help="English word file (default: the solver's)")
+    parser.add_argument("--snapshot", "-s", type=str, default=None,
+                        help="Snapshot to time warm starts with (default: solver_snapshot.bin next to the dictionary)")
+    parser.add_argument("--repeat", "-r", type=int, default=5, help="Processes per configuration")
+    args = parser.parse_args()
+
+    base = {"airline_dict_path": os.path.abspath(args.dict)}
+    if args.words:
+        base["english_words_path"] = os.path.abspath(args.words)
+    snapshot = os.path.abspath(args.snapshot or os.path.join(os.path.dirname(args.dict), "solver_snapshot.bin"))
+
+    # one untimed start makes sure the snapshot exists and is current
+    time_startup(dict(base, snapshot_path=snapshot), 1)
+
+    print(f"median of {args.repeat} fresh processes")
+    report("build", time_startup(base, args.repeat))
+    report("snapshot", time_startup(dict(base, snapshot_path=snapshot), args.repeat))
+
+if __name__ == "__main__":
+    main()
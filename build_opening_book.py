@@ -0,0 +1,74 @@
+import argparse
+import json
+import time
+from hangman_v4 import HangmanSolver, OPENING_BOOK_VERSION
+
+def phrase_signatures(phrases_path):
+    """Distinct word-length signatures (tuples) of the phrases, streamed line by line."""
+    signatures = set()
+    with open(phrases_path, "r", encoding="utf-8") as f:
+        for line in f:
+            lengths = tuple(len(w) for w in line.lower().split())
+            if lengths:
+                signatures.add(lengths)
+    return signatures
+
+def build_opening_book(solver, signatures, depth=2):
+    """
+    For every signature, play the solver from the fully blank state assuming
+    each guess misses, and record up to `depth` guesses. While nothing is
+    revealed the solver's choice depends only on the word lengths, so these
+    moves are valid for any puzzle with that signature.
+    """
+    book = {}
+    for n, sig in enumerate(sorted(signatures), 1):
+        state = " ".join("_" * length for length in sig)
+        guessed = []
+        line = ""
+        solver.reset()
+        for _ in range(depth):
+            output = solver.get_next_guess(state, guessed, 6)
+            if output["status"] != "playing" or not output["nextGuess"]:
+                break
+            line += output["nextGuess"]
+            guessed.append(output["nextGuess"])
+        if line:
+            book[" ".join(str(length) for length in sig)] = line
+        if n % 500 == 0:
+            print(f"{n}/{len(signatures)} signatures")
+    return book
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dict", "-d", type=str, required=True, help="Airline dictionary path")
+    parser.add_argument("--phrases", "-p", type=str, default="data/airlines_cleaned.txt",
+                        help="Phrase file whose word-length signatures are precomputed")
+    parser.add_argument("--depth", type=int, default=2, help="Guesses stored per signature")
+    parser.add_argument("--affix-table", type=str, default=None,
+                        help="Mined affix table the serving solver will use (the book is only valid with it)")
+    parser.add_argument("--out", "-o", type=str, default="data/opening_book.json", help="Output book path")
+    args = parser.parse_args()
+
+    start = time.time()
+    solver = HangmanSolver(airline_dict_path=args.dict, affix_table_path=args.affix_table)
+
+    # every phrase signature plus every single word length in the dictionary
+    signatures = phrase_signatures(args.phrases)
+    signatures |= {(length,) for length in solver.words_by_len}
+    print("Number of signatures:", len(signatures))
+
+    book = build_opening_book(solver, signatures, depth=args.depth)
+
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump({
+            "version": OPENING_BOOK_VERSION,
+            "depth": args.depth,
+            "dictSize": solver.dictionary.size,
+            "config": solver.config_fingerprint(),
+            "book": book,
+        }, f, separators=(",", ":"))
+
+    print(f"Wrote {len(book)} entries to {args.out} in {time.time() - start:.1f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+import argparse
+import gzip
+import json
+import time
+from multiprocessing import Pool
+from hangman_v4 import HangmanSolver, POLICY_VERSION, default_snapshot_path, policy_key, update_pattern
+
+solver = None  # per process: built in main(), mapped from the snapshot by init_worker()
+
+def init_worker(solver_kwargs):
+    """Pool initializer: open the solver from the snapshot main() wrote (works under fork and spawn)."""
+    global solver
+    solver = HangmanSolver(**solver_kwargs)
+
+def walk_length(length):
+    """
+    Walk the solver's decision tree for one word length: ask for a guess at
+    the start state, split the candidates by reveal outcome and recurse into
+    every unsolved outcome. Returns {policy_key: guess}.
+    """
+    table = {}
+    stack = [("_" * length, "", solver.words_by_len[length])]
+    while stack:
+        pattern, guessed, candidates = stack.pop()
+        output = solver.get_next_guess(pattern, list(guessed), 6)
+        guess = output["nextGuess"]
+        if output["status"] != "playing" or not guess:
+            continue
+        table[policy_key(pattern, guessed)] = guess
+
+        outcomes = {}
+        for w in candidates:
+            outcomes.setdefault(update_pattern(w, pattern, guess), []).append(w)
+        guessed += guess
+        for new_pattern, cands in outcomes.items():
+            if "_" in new_pattern:
+                stack.append((new_pattern, guessed, cands))
+    return length, table
+
+def main():
+    global solver
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dict", "-d", type=str, required=True, help="Airline dictionary path")
+    parser.add_argument("--lengths", type=str, default=None, help="Comma-separated word lengths (default: all)")
+    parser.add_argument("--workers", "-w", type=int, default=1, help="Worker processes (one length per task)")
+    parser.add_argument("--affix-table", type=str, default=None,
+                        help="Mined affix table the serving solver will use (the policy is only valid with it)")
+    parser.add_argument("--snapshot", "-s", type=str, default=None,
+                        help="Solver snapshot the workers open (default: solver_snapshot.bin next to the dictionary)")
+    parser.add_argument("--out", "-o", type=str, default="data/policy.json.gz", help="Output policy path")
+    args = parser.parse_args()
+
+    start = time.time()
+    solver_kwargs = {
+        "airline_dict_path": args.dict,
+        "affix_table_path": args.affix_table,
+        "snapshot_path": args.snapshot or default_snapshot_path(args.dict),
+    }
+    # writes the snapshot if it is missing or stale, so workers only map it
+    solver = HangmanSolver(**solver_kwargs)
+
+    if args.lengths:
+        lengths = [int(x) for x in args.lengths.split(",")]
+    else:
+        # largest buckets first so the pool doesn't end on a long tail
+        lengths = sorted(solver.words_by_len, key=lambda n: -len(solver.words_by_len[n]))
+
+    policy = {}
+    with Pool(args.workers, initializer=init_worker, initargs=(solver_kwargs,)) as pool:
+        for length, table in pool.imap_unordered(walk_length, lengths):
+            policy.update(table)
+            print(f"length {length}: {len(table)} states ({time.time() - start:.1f}s)")
+
+    with gzip.open(args.out, "wt", encoding="utf-8") as f:
+        json.dump({
+            "version": POLICY_VERSION,
+            "dictSize": solver.dictionary.size,
+            "config": solver.config_fingerprint(),
+            "policy": policy,
+        }, f, separators=(",", ":"))
+
+    print(f"Wrote {len(policy)} states to {args.out} in {time.time() - start:.1f}s")
+
+if __name__ == "__main__":
+    main()
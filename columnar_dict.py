@@ -0,0 +1,162 @@
+import json
+import mmap
+import os
+import struct
+import tempfile
+from collections import defaultdict
+
+import numpy as np
+
+COLUMNAR_MAGIC = b"HMCOLDIC"
+COLUMNAR_VERSION = 1
+ALIGN = 64  # every array starts on a 64-byte boundary of the data section
+
+class ColumnarDictionary:
+    """
+    Dictionary as one fixed-width uint8 matrix per word length, plus packed
+    letter bitmaps over the rows of each matrix. A word id is its row number.
+      words/<L>     (n, L)           the words, one per row
+      pos/<L>       (L, 26, n/8)     bit i set = word i has the letter at the position
+      contains/<L>  (26, n/8)        bit i set = word i contains the letter
+    Other arrays (the solver keeps its priors here) are stored alongside.
+
+    On disk: magic, uint64 header length, JSON header with the offset, dtype
+    and shape of every array, then the 64-byte aligned arrays. open() maps the
+    file read-only and wraps the arrays without copying them, so every process
+    using the same file shares one copy of the pages.
+    """
+
+    def __init__(self, arrays, meta=None, mm=None):
+        self.arrays = arrays
+        self.meta = meta or {}
+        self._mm = mm  # keeps the mapping open while the arrays are in use
+        self.lengths = sorted(int(name.split("/")[1]) for name in arrays if name.startswith("words/"))
+        self.size = sum(len(self.matrix(length)) for length in self.lengths)
+
+    @classmethod
+    def from_words(cls, words, extra=None, meta=None):
+        """Build the matrices and bitmaps from lowercase a-z words."""
+        by_len = defaultdict(list)
+        for w in words:
+            by_len[len(w)].append(w)
+
+        codes = np.arange(ord("a"), ord("z") + 1, dtype=np.uint8)
+        arrays = {}
+        for length, bucket in sorted(by_len.items()):
+            chars = np.frombuffer("".join(bucket).encode("ascii"), dtype=np.uint8).reshape(-1, length)
+            if ((chars < codes[0]) | (chars > codes[-1])).any():
+                raise ValueError(f"Columnar dictionaries hold a-z words only (length {length} has others)")
+            hits = chars.T[:, None, :] == codes[None, :, None]              # positions x 26 x n
+            pos = np.packbits(hits, axis=2, bitorder="little")
+            arrays[f"words/{length}"] = chars
+            arrays[f"pos/{length}"] = pos
+            arrays[f"contains/{length}"] = np.bitwise_or.reduce(pos, axis=0)
+        arrays.update(extra or {})
+        return cls(arrays, meta)
+
+    def save(self, path, extra=None, meta=None):
+        """
+        Write the dictionary (plus `extra` arrays and `meta`) to `path`
+        atomically. Every writer uses its own temporary file, so processes
+        saving the same file at once don't clobber each other; the last
+        rename wins and all of them wrote the same data.
+        """
+        arrays = dict(self.arrays, **(extra or {}))
+        header = {"version": COLUMNAR_VERSION, "meta": dict(self.meta, **(meta or {})), "arrays": {}}
+        layout, offset = [], 0
+        for name, arr in arrays.items():
+            arr = np.ascontiguousarray(arr)
+            offset = -(-offset // ALIGN) * ALIGN
+            header["arrays"][name] = {"offset": offset, "dtype": arr.dtype.str, "shape": list(arr.shape)}
+            layout.append((offset, arr))
+            offset += arr.nbytes
+        blob = json.dumps(header).encode("utf-8")
+        data_start = _data_start(len(blob))
+
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)),
+                                        prefix=os.path.basename(path) + ".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(COLUMNAR_MAGIC)
+                f.write(struct.pack("<Q", len(blob)))
+                f.write(blob)
+                for offset, arr in layout:
+                    f.seek(data_start + offset)  # gaps read back as zeros
+                    f.write(arr.tobytes())
+            os.chmod(tmp_path, 0o644)  # mkstemp creates it private
+            try:
+                os.replace(tmp_path, path)
+            except PermissionError:
+                # Windows can't replace a file another process has mapped;
+                # that process saved it first, which is just as good
+                if not os.path.exists(path):
+                    raise
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    @classmethod
+    def open(cls, path):
+        """Map a file written by save(); raises ValueError if it isn't one."""
+        with open(path, "rb") as f:
+            if f.read(len(COLUMNAR_MAGIC)) != COLUMNAR_MAGIC:
+                raise ValueError(f"{path} is not a columnar dictionary")
+            (header_len,) = struct.unpack("<Q", f.read(8))
+            header = json.loads(f.read(header_len).decode("utf-8"))
+            if header.get("version") != COLUMNAR_VERSION:
+                raise ValueError(f"Unsupported columnar dictionary version in {path}")
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        data_start = _data_start(header_len)
+        arrays = {}
+        for name, spec in header["arrays"].items():
+            shape = tuple(spec["shape"])
+            arrays[name] = np.frombuffer(mm, dtype=np.dtype(spec["dtype"]), count=int(np.prod(shape)),
+                                         offset=data_start + spec["offset"]).reshape(shape)
+        return cls(arrays, header["meta"], mm)
+
+    def matrix(self, length):
+        """(n, length) uint8 matrix of the words of that length (empty if none)."""
+        chars = self.arrays.get(f"words/{length}")
+        return chars if chars is not None else np.empty((0, length), dtype=np.uint8)
+
+    def words(self, length, ids=None):
+        """Decode word ids (default: all words of that length) into strings."""
+        chars = self.matrix(length) if ids is None else self.matrix(length)[ids]
+        joined = chars.tobytes().decode("ascii")
+        return [joined[i:i + length] for i in range(0, len(joined), length)]
+
+    def filter_ids(self, word_pattern, guessed):
+        """
+        Ids of the words matching one word pattern like '_la_k_o_': revealed
+        letters in place and no letter that was guessed but not revealed
+        anywhere in the word.
+        """
+        length = len(word_pattern)
+        pos = self.arrays.get(f"pos/{length}")
+        if pos is None:
+            return np.empty(0, dtype=np.intp)
+        n = len(self.matrix(length))
+
+        # revealed positions: intersect the positional bitmaps
+        bits = None
+        for i, ch in enumerate(word_pattern):
+            if ch != "_":
+                code = ord(ch) - ord("a")
+                if not 0 <= code < 26:
+                    return np.empty(0, dtype=np.intp)
+                bits = pos[i, code] if bits is None else bits & pos[i, code]
+
+        # words containing letters known to be absent anywhere
+        absent = [ord(g) - ord("a") for g in guessed if g not in word_pattern and "a" <= g <= "z"]
+        if absent:
+            allowed = ~np.bitwise_or.reduce(self.arrays[f"contains/{length}"][absent], axis=0)
+            bits = allowed if bits is None else bits & allowed
+
+        if bits is None:
+            return np.arange(n)
+        return np.flatnonzero(np.unpackbits(bits, count=n, bitorder="little"))
+
+def _data_start(header_len):
+    """Offset of the data section: after magic, length and header, aligned."""
+    return -(-(len(COLUMNAR_MAGIC) + 8 + header_len) // ALIGN) * ALIGN
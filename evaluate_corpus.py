@@ -0,0 +1,305 @@
+import argparse
+import glob
+import hashlib
+import json
+import os
+import socket
+import sqlite3
+import sys
+import time
+from multiprocessing import Process
+from multiprocessing.connection import wait
+from hangman_v4 import HangmanSolver, default_snapshot_path, play_game
+
+solver = None  # per worker process: mapped from the snapshot by worker()
+
+# ---------- Work queue ----------
+# One SQLite file in the output directory holds the shards of the corpus and
+# who is playing them. Shards are byte ranges of the corpus, so a worker reads
+# only its own lines. Every process (on any machine sharing the directory)
+# claims the lowest pending shard in an IMMEDIATE transaction; a running
+# shard whose heartbeat is older than the lease goes back to the pool.
+
+def open_queue(out_dir):
+    conn = sqlite3.connect(os.path.join(out_dir, "queue.db"), timeout=60, isolation_level=None)
+    conn.execute("""CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)""")
+    conn.execute("""CREATE TABLE IF NOT EXISTS shards (
+        id INTEGER PRIMARY KEY,
+        offset INTEGER NOT NULL,      -- byte offset of the shard's first line
+        first_line INTEGER NOT NULL,
+        lines INTEGER NOT NULL,
+        status TEXT NOT NULL DEFAULT 'pending',  -- pending | running | done
+        owner TEXT,                   -- host:pid of the process playing it
+        heartbeat REAL)""")
+    return conn
+
+def scan_corpus(path, shard_size):
+    """Stream the corpus once: its sha1 and the (offset, first_line, lines) of every shard."""
+    h = hashlib.sha1()
+    shards = []
+    offset = line_no = 0
+    with open(path, "rb") as f:
+        for line in f:
+            if line_no % shard_size == 0:
+                shards.append([offset, line_no, 0])
+            shards[-1][2] += 1
+            h.update(line)
+            offset += len(line)
+            line_no += 1
+    return h.hexdigest(), shards
+
+def init_queue(conn, corpus, shard_size):
+    """Fill the queue on the first run; later runs must be for the same corpus and shard size."""
+    digest, shards = scan_corpus(corpus, shard_size)
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        meta = dict(conn.execute("SELECT key, value FROM meta"))
+        if not meta:
+            conn.executemany("INSERT INTO meta VALUES (?, ?)",
+                             [("corpusSha1", digest), ("shardSize", str(shard_size))])
+            conn.executemany("INSERT INTO shards (id, offset, first_line, lines) VALUES (?, ?, ?, ?)",
+                             [(i, *shard) for i, shard in enumerate(shards)])
+        elif meta["corpusSha1"] != digest or int(meta["shardSize"]) != shard_size:
+            raise SystemExit("The output directory belongs to a different corpus or shard size; "
+                             "use a new --out-dir")
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+
+def reclaim_dead(conn, host):
+    """
+    Put back shards left running by processes on this host that no longer
+    exist. Signal 0 only probes a process on POSIX (on Windows it is
+    CTRL_C_EVENT), so there dead owners' shards wait for the lease instead.
+    """
+    if os.name == "nt":
+        return
+    for shard_id, owner in conn.execute("SELECT id, owner FROM shards WHERE status = 'running'").fetchall():
+        owner_host, _, pid = owner.rpartition(":")
+        if owner_host != host:
+            continue
+        try:
+            os.kill(int(pid), 0)
+        except ProcessLookupError:
+            conn.execute("UPDATE shards SET status = 'pending', owner = NULL WHERE id = ? AND owner = ?",
+                         (shard_id, owner))
+        except (ValueError, OverflowError, OSError):
+            pass  # alive and run by someone else (PermissionError), or not a pid we can probe
+
+def claim(conn, owner, lease):
+    """(id, offset, first_line, lines) of the next shard to play, now owned by `owner`; None when all are taken."""
+    now = time.time()
+    conn.execute("BEGIN IMMEDIATE")
+    shard = conn.execute("""SELECT id, offset, first_line, lines FROM shards
+                            WHERE status = 'pending' OR (status = 'running' AND heartbeat < ?)
+                            ORDER BY id LIMIT 1""", (now - lease,)).fetchone()
+    if shard:
+        conn.execute("UPDATE shards SET status = 'running', owner = ?, heartbeat = ? WHERE id = ?",
+                     (owner, now, shard[0]))
+    conn.execute("COMMIT")
+    return shard
+
+def progress(conn):
+    """{status: shard count}"""
+    return dict(conn.execute("SELECT status, COUNT(*) FROM shards GROUP BY status"))
+
+# ---------- Playing shards ----------
+def shard_path(out_dir, shard_id):
+    return os.path.join(out_dir, f"shard-{shard_id:06d}.ndjson")
+
+def part_path(final, owner):
+    """The .part file `owner` (host:pid) writes a shard to; every owner has its own."""
+    return f"{final}.part.{owner.replace(':', '-')}"
+
+def recorded_lines(final):
+    """
+    Complete records of a shard left in .part files by earlier owners: the
+    longest run, since each owner starts from the records of the one before.
+    A torn last line (the process died while writing it) is left out.
+    """
+    best = []
+    for part in glob.glob(glob.escape(final) + ".part.*"):
+        try:
+            with open(part, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            continue  # finished or discarded meanwhile
+        lines = data[:data.rfind(b"\n") + 1].splitlines(keepends=True)
+        if len(lines) > len(best):
+            best = lines
+    return best
+
+def remove_quietly(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+def game_record(line_no, phrase, result, seconds):
+    """One line of a shard file."""
+    guesses = [h["guess"] for h in result["history"] if "guess" in h]
+    hidden = phrase.lower()
+    return {
+        "line": line_no,
+        "hiddenWord": phrase,
+        "status": result["status"],
+        "guesses": len(guesses),
+        "wrongGuesses": sum(1 for g in guesses if g not in hidden),
+        "seconds": round(seconds, 6),
+    }
+
+def finish_shard(conn, final, part, shard_id, owner):
+    """
+    Mark the shard done and move `part` into place, only if `owner` still
+    holds it; otherwise its lease ran out and `part` is discarded. Returns
+    whether the shard was finished here.
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        done = conn.execute("""UPDATE shards SET status = 'done', heartbeat = ?
+                               WHERE id = ? AND owner = ? AND status = 'running'""",
+                            (time.time(), shard_id, owner)).rowcount == 1
+        if done and os.path.exists(part):
+            os.replace(part, final)
+        conn.execute("COMMIT" if done else "ROLLBACK")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    if done:
+        for stale in glob.glob(glob.escape(final) + ".part.*"):
+            remove_quietly(stale)
+    else:
+        remove_quietly(part)
+    return done
+
+def play_shard(conn, out_dir, corpus, shard, owner, heartbeat_every=10.0):
+    """
+    Play one shard into this owner's .part file, starting after the records
+    earlier owners left, and rename it to .ndjson when the shard is complete.
+    Stops early, discarding the file, if a heartbeat finds the shard was
+    handed to another worker. Returns whether the shard was finished here.
+    """
+    shard_id, offset, first_line, lines = shard
+    final = shard_path(out_dir, shard_id)
+    part = part_path(final, owner)
+    if not os.path.exists(final):
+        previous = recorded_lines(final)
+        resume_after = json.loads(previous[-1])["line"] if previous else -1
+        with open(corpus, "rb") as f:
+            f.seek(offset)
+            raw_lines = [f.readline() for _ in range(lines)]
+
+        last_beat = time.time()
+        with open(part, "wb") as out:
+            out.writelines(previous)
+            out.flush()
+            for line_no, raw in enumerate(raw_lines, start=first_line):
+                phrase = raw.decode("utf-8").strip()
+                if line_no <= resume_after or not phrase:
+                    continue
+                start = time.perf_counter()
+                result = play_game(solver, phrase)
+                record = game_record(line_no, phrase, result, time.perf_counter() - start)
+                out.write((json.dumps(record) + "\n").encode("utf-8"))
+                out.flush()
+                if time.time() - last_beat > heartbeat_every:
+                    last_beat = time.time()
+                    beat = conn.execute("""UPDATE shards SET heartbeat = ?
+                                           WHERE id = ? AND owner = ? AND status = 'running'""",
+                                        (last_beat, shard_id, owner))
+                    if beat.rowcount == 0:
+                        break  # the lease ran out and another worker has the shard
+    return finish_shard(conn, final, part, shard_id, owner)
+
+def worker(out_dir, corpus, lease, solver_kwargs):
+    """Open the solver from the snapshot main() wrote, then claim and play shards until none are left."""
+    global solver
+    solver = HangmanSolver(**solver_kwargs)
+    owner = f"{socket.gethostname()}:{os.getpid()}"
+    conn = open_queue(out_dir)
+    while True:
+        shard = claim(conn, owner, lease)
+        if shard is None:
+            break
+        play_shard(conn, out_dir, corpus, shard, owner)
+    conn.close()
+
+# ---------- Summary ----------
+def summarize_shards(out_dir):
+    """Totals over the records of every finished shard, read one line at a time."""
+    total = successes = guesses = wrong = 0
+    seconds = 0.0
+    for name in sorted(os.listdir(out_dir)):
+        if not (name.startswith("shard-") and name.endswith(".ndjson")):
+            continue
+        with open(os.path.join(out_dir, name), "r", encoding="utf-8") as f:
+            for line in f:
+                rec = json.loads(line)
+                total += 1
+                successes += rec["status"] == "success"
+                guesses += rec["guesses"]
+                wrong += rec["wrongGuesses"]
+                seconds += rec["seconds"]
+    return {
+        "totalWords": total,
+        "successes": successes,
+        "failures": total - successes,
+        "successRate": successes / total if total else 0.0,
+        "avgGuesses": guesses / total if total else 0.0,
+        "avgWrongGuesses": wrong / total if total else 0.0,
+        "secondsPerGame": seconds / total if total else 0.0,
+    }
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dict", "-d", type=str, required=True, help="Airline dictionary path")
+    parser.add_argument("--corpus", "-c", type=str, default="data/airlines_cleaned.txt",
+                        help="Hidden words/phrases to play, one per line")
+    parser.add_argument("--out-dir", "-o", type=str, required=True,
+                        help="Directory for the work queue and the shard files (may be shared between machines)")
+    parser.add_argument("--shard-size", type=int, default=1000, help="Corpus lines per shard")
+    parser.add_argument("--workers", "-w", type=int, default=os.cpu_count(), help="Worker processes on this machine")
+    parser.add_argument("--snapshot", "-s", type=str, default=None,
+                        help="Solver snapshot the workers open (default: solver_snapshot.bin next to the dictionary)")
+    parser.add_argument("--lease", type=float, default=300.0,
+                        help="Seconds without a heartbeat after which a running shard is played again")
+    parser.add_argument("--summary", action="store_true", help="Only summarize the finished shards")
+    args = parser.parse_args()
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    conn = open_queue(args.out_dir)
+    init_queue(conn, args.corpus, args.shard_size)
+    reclaim_dead(conn, socket.gethostname())
+
+    counts = progress(conn)
+    total_shards = sum(counts.values())
+    if not args.summary and counts.get("done", 0) < total_shards:
+        start = time.time()
+        solver_kwargs = {"airline_dict_path": args.dict, "snapshot_path": args.snapshot or default_snapshot_path(args.dict)}
+        # writes the snapshot if it is missing or stale, so workers only map it
+        HangmanSolver(**solver_kwargs)
+        print(f"Solver ready in {time.time() - start:.1f}s; {counts.get('done', 0)}/{total_shards} shards done, "
+              f"starting {args.workers} workers", file=sys.stderr)
+
+        workers = [Process(target=worker, args=(args.out_dir, args.corpus, args.lease, solver_kwargs))
+                   for _ in range(args.workers)]
+        for p in workers:
+            p.start()
+        while any(p.is_alive() for p in workers):
+            wait([p.sentinel for p in workers if p.is_alive()], timeout=10)
+            counts = progress(conn)
+            print(f"{counts.get('done', 0)}/{total_shards} shards done, {counts.get('running', 0)} running "
+                  f"({time.time() - start:.0f}s)", file=sys.stderr)
+        for p in workers:
+            p.join()
+
+    counts = progress(conn)
+    stats = summarize_shards(args.out_dir)
+    stats["shardsDone"] = counts.get("done", 0)
+    stats["shards"] = total_shards
+    print("\n=== SUMMARY ===")
+    print(json.dumps(stats, indent=2))
+
+if __name__ == "__main__":
+    main()
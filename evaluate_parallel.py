@@ -0,0 +1,70 @@
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from multiprocessing import Pool
+from hangman_v4 import HangmanSolver, default_snapshot_path, play_game
+from test_model import summarize
+
+solver = None  # per process: mapped from the snapshot by init_worker()
+
+def init_worker(solver_kwargs):
+    """Pool initializer: open the solver from the snapshot main() wrote (works under fork and spawn)."""
+    global solver
+    solver = HangmanSolver(**solver_kwargs)
+
+def play(hidden_word):
+    """Play one game on the worker's copy of the solver (its state is per process)."""
+    return play_game(solver, hidden_word)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dict", "-d", type=str, required=True, help="Airline dictionary path")
+    parser.add_argument("--games", "-g", type=str, default="data/airlines_cleaned.txt",
+                        help="Hidden words/phrases to play, one per line")
+    parser.add_argument("--sample", "-n", type=int, default=None, help="Play a random sample of this many games")
+    parser.add_argument("--seed", type=int, default=42, help="Seed for --sample")
+    parser.add_argument("--workers", "-w", type=int, default=os.cpu_count(), help="Worker processes")
+    parser.add_argument("--snapshot", "-s", type=str, default=None,
+                        help="Solver snapshot the workers open (default: solver_snapshot.bin next to the dictionary)")
+    parser.add_argument("--out", "-o", type=str, default=None, help="Write every game's result here as NDJSON")
+    args = parser.parse_args()
+
+    start = time.time()
+    solver_kwargs = {"airline_dict_path": args.dict, "snapshot_path": args.snapshot or default_snapshot_path(args.dict)}
+    # writes the snapshot if it is missing or stale, so workers only map it
+    HangmanSolver(**solver_kwargs)
+
+    with open(args.games, "r", encoding="utf-8") as f:
+        games = [line.strip() for line in f if line.strip()]
+    if args.sample:
+        games = random.Random(args.seed).sample(games, min(args.sample, len(games)))
+    print(f"Solver ready in {time.time() - start:.1f}s; playing {len(games)} games on {args.workers} workers",
+          file=sys.stderr)
+
+    play_start = time.time()
+    results = []
+    report_every = max(1, len(games) // 20)
+    with Pool(args.workers, initializer=init_worker, initargs=(solver_kwargs,)) as pool:
+        for res in pool.imap(play, games, chunksize=64):
+            results.append(res)
+            if len(results) % report_every == 0:
+                elapsed = time.time() - play_start
+                print(f"{len(results)}/{len(games)} games ({len(results) / elapsed:.0f} games/s)", file=sys.stderr)
+    wall = time.time() - play_start
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            for res in results:
+                f.write(json.dumps(res) + "\n")
+
+    stats = summarize(results)
+    stats["wallSeconds"] = wall
+    stats["gamesPerSecond"] = len(results) / wall if wall else 0.0
+    print("\n=== SUMMARY ===")
+    print(json.dumps(stats, indent=2))
+
+if __name__ == "__main__":
+    main()
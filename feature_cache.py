@@ -0,0 +1,104 @@
+import os
+import sys
+
+import numpy as np
+
+from hangman_v4 import EIG_FEATURES, policy_key, weighted_scores
+
+FEATURE_CACHE_VERSION = 3
+
+class FeatureCache:
+    """
+    HangmanSolver.guess_features for every game state seen while tuning,
+    keyed by (currentWordState, guessed letters) like the policy table. The
+    features don't depend on eig_weights, so replaying a game with other
+    weights only takes a dot product per turn; the solver runs only for
+    states no earlier weights led to.
+
+    On disk (np.savez): version, the solver's config_fingerprint without
+    the weights, the keys, each entry's letters and feature row count, and
+    all feature rows in one float64 matrix. Entries whose guess doesn't
+    depend on the weights have one letter (none for "reset") and no rows.
+    Caches built for a different dictionary or affix configuration are
+    ignored.
+    """
+
+    def __init__(self, solver, path=None):
+        self.solver = solver
+        self.path = path
+        self.entries = {}  # key -> (letters, features or None)
+        self.new_keys = []  # keys added since load(), for save() and take_new()
+        self.hits = 0
+        self.misses = 0
+        if path and os.path.exists(path):
+            self.load(path)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def features(self, currentWordState, guessedLetters):
+        """(letters, features) of a state, from the cache or the solver."""
+        key = policy_key(currentWordState, self.solver._normalize_guessed(guessedLetters))
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            return entry
+        self.misses += 1
+        # a fresh GameState: cached states come from many games, in any order
+        entry = self.solver.guess_features(currentWordState, guessedLetters, self.solver.new_state())
+        self.entries[key] = entry
+        self.new_keys.append(key)
+        return entry
+
+    def guess(self, currentWordState, guessedLetters, weights):
+        """The solver's next letter for the state with `weights` as eig_weights ("" = reset)."""
+        letters, features = self.features(currentWordState, guessedLetters)
+        if features is None:
+            return letters[0] if letters else ""
+        return letters[int(np.argmax(weighted_scores(features, weights)))]
+
+    def take_new(self):
+        """Entries added since the last call, e.g. to send back from a worker process."""
+        new = {key: self.entries[key] for key in self.new_keys}
+        self.new_keys = []
+        return new
+
+    def update(self, entries):
+        """Add entries computed elsewhere (see take_new)."""
+        for key, entry in entries.items():
+            if key not in self.entries:
+                self.entries[key] = entry
+                self.new_keys.append(key)
+
+    def load(self, path):
+        with np.load(path) as data:
+            if (int(data["version"]) != FEATURE_CACHE_VERSION
+                    or str(data["config"]) != self.solver.config_fingerprint(weights=False)):
+                print(f"Ignoring feature cache {path}: built for a different dictionary or configuration",
+                      file=sys.stderr)
+                return
+            rows = np.split(data["features"], np.cumsum(data["rows"])[:-1])
+            for key, letters, n, features in zip(data["keys"].tolist(), data["letters"].tolist(),
+                                                 data["rows"].tolist(), rows):
+                self.entries[key] = (list(letters), features if n else None)
+        self.new_keys = []
+
+    def save(self, path=None):
+        """Write the cache (atomically) if anything was added since it was loaded."""
+        path = path or self.path
+        if not path or not self.new_keys:
+            return
+        keys = list(self.entries)
+        entries = [self.entries[key] for key in keys]
+        rows = [0 if features is None else len(features) for _, features in entries]
+        features = [f for _, f in entries if f is not None]
+        tmp_path = path + ".tmp.npz"
+        np.savez(tmp_path,
+                 version=FEATURE_CACHE_VERSION,
+                 config=self.solver.config_fingerprint(weights=False),
+                 keys=np.array(keys, dtype=str),
+                 letters=np.array(["".join(letters) for letters, _ in entries], dtype=str),
+                 rows=np.array(rows, dtype=np.int64),
+                 features=np.concatenate(features) if features else np.empty((0, len(EIG_FEATURES))))
+        os.replace(tmp_path, path)
+        self.new_keys = []
@@ -1,80 +1,54 @@
 import itertools
+import math
+import os
 import random
 import json
 import argparse
-from collections import defaultdict, Counter
-from hangman_v4 import HangmanSolver, update_pattern
+from multiprocessing import Pool
+import numpy as np
+from hangman_v4 import HangmanSolver, default_snapshot_path, update_pattern, weighted_scores
+from feature_cache import FeatureCache
 
-def evaluate_solver(solver, words, weights):
-    """Run solver in auto mode with given weights, return average success rate."""
-    α, β, γ, δ, ε, ζ = weights
+# set up by main() in the parent and by init_worker() in every pool worker
+solver = None
+cache = None
+folds = None
+valid_combos = None
+
+def init_worker(solver_kwargs, cache_path, use_cache, worker_folds, combos):
+    """
+    Pool initializer: open the solver from the snapshot main() wrote and load
+    the feature cache as it was on disk, so workers are set up the same way
+    under fork and spawn.
+    """
+    global solver, cache, folds, valid_combos
+    solver = HangmanSolver(**solver_kwargs)
+    cache = FeatureCache(solver, cache_path) if use_cache else None
+    folds = worker_folds
+    valid_combos = combos
+
+def evaluate_solver(solver, words, weights, cache=None):
+    """
+    Run solver in auto mode with given weights, return average success rate.
+    With a FeatureCache the guesses come from the cached features instead.
+    """
     wins = 0
     total_guesses_used = 0
 
-    # Override solver weights dynamically
-    def eig_letter_override(self, pattern, candidates, guessed):
-        blanks_idx = [i for i, ch in enumerate(pattern) if ch == "_"]
-        if not blanks_idx or not candidates:
-            return None
-
-        remaining_letters = set(ch for w in candidates for ch in w) - guessed
-        if not remaining_letters:
-            remaining_letters = set(self.letters) - guessed
-
-        best_letter, best_score = None, -1.0
-        total = len(candidates)
-
-        for l in remaining_letters:
-            # --- EIG ---
-            buckets = Counter()
-            for w in candidates:
-                mask_bits = ["1" if w[i] == l else "0" for i in blanks_idx]
-                buckets["".join(mask_bits)] += 1
-            expected_remaining = sum(sz * sz for sz in buckets.values()) / total
-            eig_score = 1.0 - (expected_remaining / total)  # normalize so bigger = better
-
-            # --- Priors ---
-            lp = self.letter_prior.get(l, 0.0)
-
-            pos_score = 0.0
-            for i in blanks_idx:
-                pos_score += self.pos_prior[len(pattern)][i].get(l, 0.0)
-
-            left_bigram_score = 0.0
-            right_bigram_score = 0.0
-            for i in blanks_idx:
-                left = pattern[i-1] if i > 0 and pattern[i-1] != "_" else "^"
-                right = pattern[i+1] if i < len(pattern)-1 and pattern[i+1] != "_" else "$"
-                left_bigram_score += self.left_bigram[left].get(l, 0.0)
-                right_bigram_score += self.right_bigram[l].get(right, 0.0)
-
-            affix_score = self._affix_bonus(pattern, l)
-
-            # --- Combined ---
-            score = (
-                α*eig_score +
-                β*lp +
-                γ*pos_score +
-                δ*left_bigram_score +
-                ε*right_bigram_score +
-                ζ*affix_score
-            )
-
-            if score > best_score:
-                best_score, best_letter = score, l
-        return best_letter
-
-    # Monkey patch the method with weights
-    solver._eig_letter_for_word = eig_letter_override.__get__(solver, HangmanSolver)
+    # Score letters with the weights being evaluated
+    solver.eig_weights = tuple(weights)
 
     for hidden_word in words:
+        solver.reset()
         pattern = "_" * len(hidden_word)
         guessedLetters = []
         guessesRemaining = 6
 
         while "_" in pattern and guessesRemaining > 0:
-            output = solver.get_next_guess(pattern, guessedLetters, guessesRemaining)
-            guess = output["nextGuess"]
+            if cache is not None:
+                guess = cache.guess(pattern, guessedLetters, weights)
+            else:
+                guess = solver.get_next_guess(pattern, guessedLetters, guessesRemaining)["nextGuess"]
             if not guess:
                 break
 
@@ -90,21 +64,263 @@ def evaluate_solver(solver, words, weights):
 
     return wins / len(words), total_guesses_used / len(words)
 
+def evaluate_policies(cache, words, weights):
+    """
+    Lockstep version of evaluate_solver for many weight vectors at once
+    (`weights` is policies x 6): every word is played by all policies
+    together. Policies in the same state share its cached features, and one
+    weighted_scores call scores the letters for all of them, so each
+    distinct state is looked up once per word rather than once per policy.
+    Returns per-policy arrays of win rates and average guesses used, equal
+    to evaluate_solver's for each row.
+    """
+    weights = np.asarray(weights, dtype=np.float64)
+    wins = np.zeros(len(weights))
+    total_guesses_used = np.zeros(len(weights))
+
+    for hidden_word in words:
+        # (pattern, guessed letters) -> (policies in that state, guesses remaining)
+        active = {("_" * len(hidden_word), frozenset()): (np.arange(len(weights)), 6)}
+        while active:
+            next_active = {}
+            for (pattern, guessed), (policies, guessesRemaining) in active.items():
+                letters, features = cache.features(pattern, guessed)
+                if features is None:
+                    picks = np.zeros(len(policies), dtype=np.intp)
+                else:
+                    picks = np.argmax(weighted_scores(features, weights[policies]), axis=0)
+
+                for pick in np.unique(picks):
+                    group = policies[picks == pick]
+                    guess = letters[pick] if letters else ""
+                    if not guess:
+                        total_guesses_used[group] += 6 - guessesRemaining
+                        continue
+                    new_pattern, remaining = pattern, guessesRemaining
+                    if guess in hidden_word:
+                        new_pattern = update_pattern(hidden_word, pattern, guess)
+                    else:
+                        remaining -= 1
+
+                    if "_" not in new_pattern:
+                        wins[group] += 1
+                        total_guesses_used[group] += 6 - remaining
+                    elif remaining == 0:
+                        total_guesses_used[group] += 6
+                    else:
+                        # other guessing orders can reach the same state
+                        key = (new_pattern, guessed | {guess})
+                        if key in next_active:
+                            group = np.concatenate([next_active[key][0], group])
+                        next_active[key] = (group, remaining)
+            active = next_active
+
+    return wins / len(words), total_guesses_used / len(words)
+
+def evaluate_job(job):
+    """
+    Play one fold with one weight combination on the worker's copy of the
+    solver. Returns the scores and the feature cache entries it added.
+    """
+    combo_idx, fold_idx = job
+    scores = evaluate_solver(solver, folds[fold_idx], valid_combos[combo_idx], cache)
+    return scores, cache.take_new() if cache is not None else {}
+
+def evaluate_fold_lockstep(fold_idx):
+    """Play one fold with every weight combination in lockstep on the worker's copy of the solver."""
+    scores = evaluate_policies(cache, folds[fold_idx], valid_combos)
+    return scores, cache.take_new()
+
+def grid_scores(pool, n_folds):
+    """
+    (combo index, win rate per fold) of every combo, in order. One job per
+    (combo, fold); imap hands results back in job order, so a combo's folds
+    arrive together and the output doesn't depend on timing.
+    """
+    jobs = [(c, f) for c in range(len(valid_combos)) for f in range(n_folds)]
+    scores = []
+    for (combo_idx, _), ((win_rate, avg_guesses), new_entries) in zip(jobs, pool.imap(evaluate_job, jobs)):
+        if new_entries:
+            cache.update(new_entries)
+        scores.append(win_rate)
+        if len(scores) == n_folds:
+            yield combo_idx, scores
+            scores = []
+
+def lockstep_scores(pool, n_folds):
+    """Like grid_scores, with one job per fold that plays all combos in lockstep."""
+    fold_rates = []
+    for (win_rates, avg_guesses), new_entries in pool.imap(evaluate_fold_lockstep, range(n_folds)):
+        cache.update(new_entries)
+        fold_rates.append(win_rates)
+    for combo_idx in range(len(valid_combos)):
+        yield combo_idx, [float(rates[combo_idx]) for rates in fold_rates]
+
+# ---------- Adaptive search ----------
+def evaluate_chunk(job):
+    """Wins of every row of a weight matrix on a chunk of words, plus the feature cache entries added."""
+    weights, words = job
+    win_rates, avg_guesses = evaluate_policies(cache, words, weights)
+    return np.rint(win_rates * len(words)).astype(np.int64), cache.take_new()
+
+class AdaptiveSearch:
+    """
+    Successive halving over nested samples of one shuffled word list: every
+    candidate is played on the first `min_words` words, the best 1/eta are
+    extended to eta times as many, and so on up to all of them. After every
+    round, candidates whose upper confidence bound (Hoeffding, 1 - delta) is
+    below the best lower bound are dropped as well. Candidates are always
+    compared on the same words, and their wins are kept per sample size, so
+    a candidate seen before only plays the words it hasn't seen yet.
+    Local search runs the same halving on random perturbations of the best
+    weights so far.
+    """
+
+    def __init__(self, pool, workers, words, min_words=100, eta=3, delta=0.05, seed=42):
+        self.pool = pool
+        self.workers = workers
+        self.words = words
+        self.min_words = min(min_words, len(words))
+        self.eta = eta
+        self.delta = delta
+        self.rng = np.random.default_rng(seed)
+        self.played = {}  # weights -> {sample size: wins on the first that many words}
+        self.games = 0
+
+    def extend(self, candidates, n):
+        """Play every candidate up to the first `n` words, all candidates in lockstep."""
+        by_start = {}
+        for weights in candidates:
+            start = max(self.played.setdefault(weights, {0: 0}))
+            if start < n:
+                by_start.setdefault(start, []).append(weights)
+
+        for start, group in by_start.items():
+            words = self.words[start:n]
+            matrix = np.array(group, dtype=np.float64)
+            chunks = [c for c in np.array_split(np.array(words, dtype=object), self.workers) if len(c)]
+            wins = np.zeros(len(group), dtype=np.int64)
+            for chunk_wins, new_entries in self.pool.imap(evaluate_chunk, [(matrix, list(c)) for c in chunks]):
+                cache.update(new_entries)
+                wins += chunk_wins
+            for weights, w in zip(group, wins.tolist()):
+                self.played[weights][n] = self.played[weights][start] + w
+            self.games += len(group) * len(words)
+
+    def win_rate(self, weights, n=None):
+        """Win rate on the first `n` words (default: all of them)."""
+        n = n or len(self.words)
+        return self.played[weights][n] / n
+
+    def radius(self, n):
+        """Hoeffding confidence radius of a win rate over `n` games."""
+        return math.sqrt(math.log(1 / self.delta) / (2 * n))
+
+    def best(self):
+        """Best weights played on all the words."""
+        finished = [w for w, wins in self.played.items() if len(self.words) in wins]
+        return max(finished, key=self.win_rate)
+
+    def halve(self, candidates):
+        """Successive halving of `candidates`; returns the survivors, best first."""
+        alive = list(dict.fromkeys(candidates))
+        n = self.min_words
+        while True:
+            self.extend(alive, n)
+            alive.sort(key=lambda w: -self.win_rate(w, n))
+            # everyone has played the same n games, so the radius is shared
+            threshold = self.win_rate(alive[0], n) - 2 * self.radius(n)
+            kept = [w for w in alive if self.win_rate(w, n) >= threshold]
+            if n < len(self.words):
+                kept = kept[:max(1, math.ceil(len(alive) / self.eta))]
+            print(f"  {n} words: {len(alive)} candidates -> {len(kept)} kept "
+                  f"(best {alive[0]} win_rate={self.win_rate(alive[0], n):.3f}, {self.games} games so far)",
+                  flush=True)
+            alive = kept
+            if len(alive) == 1 or n >= len(self.words):
+                return alive
+            n = min(n * self.eta, len(self.words))
+
+    def random_candidates(self, count):
+        """Weight vectors drawn uniformly from the simplex (they sum to 1, like the grid)."""
+        return [tuple(np.round(w, 3).tolist()) for w in self.rng.dirichlet(np.ones(6), count)]
+
+    def local_candidates(self, center, count, scale):
+        """Gaussian perturbations of `center`, clipped at 0 and renormalized to sum to 1."""
+        points = np.clip(np.array(center) + self.rng.normal(0, scale, (count, 6)), 0, None)
+        points /= np.maximum(points.sum(axis=1, keepdims=True), 1e-12)
+        return [tuple(np.round(w, 3).tolist()) for w in points]
+
+def adaptive_search(pool, args, grid_combos):
+    """--adaptive: successive halving over the grid plus random points, then local search."""
+    with open(args.dict, "r", encoding="utf-8") as f:
+        words = [w.strip().lower() for w in f if w.strip()]
+    random.Random(args.seed).shuffle(words)
+    words = words[:args.max_words]
+
+    search = AdaptiveSearch(pool, args.workers, words, args.min_words, args.eta, args.delta, args.seed)
+    candidates = [tuple(map(float, c)) for c in grid_combos] + search.random_candidates(args.random)
+    print(f"Halving {len(candidates)} candidates ({len(grid_combos)} grid, {args.random} random) "
+          f"over up to {len(words)} words")
+    search.halve(candidates)
+
+    scale = args.local_scale
+    for r in range(args.local_rounds):
+        best = search.best()
+        print(f"Local search round {r + 1} around {best} (scale {scale:.3f})")
+        search.halve([best] + search.local_candidates(best, args.local_samples, scale))
+        scale /= 2
+
+    best = search.best()
+    full_grid = len(search.played) * len(words)
+    print("\nBest weights:", best, "with win_rate=", search.win_rate(best), f"on {len(words)} words")
+    print(f"Games played: {search.games} "
+          f"(all {len(search.played)} candidates on all {len(words)} words: {full_grid}, "
+          f"{search.games / full_grid:.1%})")
+
 def main():
+    global solver, cache, folds, valid_combos
     parser = argparse.ArgumentParser()
     parser.add_argument("--dict", "-d", type=str, required=True, help="Airline dictionary path")
+    parser.add_argument("--folds", type=int, default=3, help="Number of random folds")
+    parser.add_argument("--fold-size", type=int, default=30, help="Phrases per fold")
+    parser.add_argument("--workers", "-w", type=int, default=os.cpu_count(), help="Worker processes")
+    parser.add_argument("--snapshot", "-s", type=str, default=None,
+                        help="Solver snapshot the workers open (default: solver_snapshot.bin next to the dictionary)")
+    parser.add_argument("--feature-cache", "-f", type=str, default=None,
+                        help="Reuse and extend the feature cache at this path (.npz)")
+    parser.add_argument("--lockstep", action="store_true",
+                        help="Play each fold once for all combinations (uses a feature cache, in memory by default)")
+    parser.add_argument("--adaptive", action="store_true",
+                        help="Successive halving with confidence-bound elimination instead of the full grid")
+    parser.add_argument("--max-words", type=int, default=1000, help="--adaptive: largest sample of words")
+    parser.add_argument("--min-words", type=int, default=100, help="--adaptive: sample size of the first round")
+    parser.add_argument("--eta", type=int, default=3, help="--adaptive: keep 1/eta per round, on eta times the words")
+    parser.add_argument("--delta", type=float, default=0.05, help="--adaptive: confidence bounds hold with 1 - delta")
+    parser.add_argument("--random", type=int, default=0, help="--adaptive: random weight vectors added to the grid")
+    parser.add_argument("--local-rounds", type=int, default=0, help="--adaptive: rounds of local search around the best")
+    parser.add_argument("--local-samples", type=int, default=30, help="--adaptive: perturbations per local round")
+    parser.add_argument("--local-scale", type=float, default=0.05, help="--adaptive: initial perturbation scale")
+    parser.add_argument("--seed", type=int, default=42, help="--adaptive: seed for the word sample and random points")
     args = parser.parse_args()
 
-    solver = HangmanSolver(airline_dict_path=args.dict)
+    solver_kwargs = {"airline_dict_path": args.dict, "snapshot_path": args.snapshot or default_snapshot_path(args.dict)}
+    # writes the snapshot if it is missing or stale, so workers only map it
+    solver = HangmanSolver(**solver_kwargs)
+    if args.feature_cache:
+        cache = FeatureCache(solver, args.feature_cache)
+        print("Feature cache states:", len(cache))
+    elif args.lockstep or args.adaptive:
+        cache = FeatureCache(solver)
 
     # Load airline words only
     with open(args.dict, "r", encoding="utf-8") as f:
         airline_words = [w.strip().lower() for w in f if w.strip()]
 
-    # --- Make 10 random folds of 100 phrases each ---
+    # --- Make random folds of phrases ---
     random.seed(42)
-    n_folds = 3
-    fold_size = 30
+    n_folds = args.folds
+    fold_size = min(args.fold_size, len(airline_words))
     folds = [random.sample(airline_words, fold_size) for _ in range(n_folds)]
 
     # Define search grid
@@ -128,21 +344,31 @@ def main():
     ]
 
     print("Number of valid combos:", len(valid_combos))
+    worker_setup = (solver_kwargs, args.feature_cache, cache is not None, folds, valid_combos)
+
+    if args.adaptive:
+        with Pool(args.workers, initializer=init_worker, initargs=worker_setup) as pool:
+            adaptive_search(pool, args, valid_combos)
+        print(f"Feature cache states: {len(cache)} ({len(cache.new_keys)} new)")
+        cache.save()
+        return
 
     best_params, best_score = None, -1.0
-    for weights in valid_combos:   # <-- use only valid combos
-        scores = []
-        for fold in folds:
-            win_rate, avg_guesses = evaluate_solver(solver, fold, weights)
-            scores.append(win_rate)
-        avg_score = sum(scores) / len(scores)
-
-        print(f"weights={weights} -> avg win_rate={avg_score:.3f}")
-        if avg_score > best_score:
-            best_score = avg_score
-            best_params = weights
+    with Pool(args.workers, initializer=init_worker, initargs=worker_setup) as pool:
+        combo_scores = lockstep_scores(pool, n_folds) if args.lockstep else grid_scores(pool, n_folds)
+        for combo_idx, scores in combo_scores:
+            weights = valid_combos[combo_idx]
+            avg_score = sum(scores) / len(scores)
+
+            print(f"weights={weights} -> avg win_rate={avg_score:.3f}", flush=True)
+            if avg_score > best_score:
+                best_score = avg_score
+                best_params = weights
 
     print("\nBest weights:", best_params, "with win_rate=", best_score)
+    if cache is not None:
+        print(f"Feature cache states: {len(cache)} ({len(cache.new_keys)} new)")
+        cache.save()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,332 +1,758 @@
-import re
 import string
-from collections import Counter, defaultdict
-import nltk
-from nltk.corpus import words as nltk_words
+from collections import Counter
+from functools import cached_property
+import numpy as np
+import gzip
+import hashlib
 import json
+import os
 import sys
+import tempfile
 import argparse
+from columnar_dict import ColumnarDictionary
+
+LETTER_CODES = {chr(ord("a") + i): i for i in range(26)}
+BOUNDARY_CODES = dict(LETTER_CODES, **{"^": 26, "$": 27})
+
+# General English vocabulary, exported from the NLTK 'words' corpus by
+# refresh_english_words() so that nltk is never imported on startup.
+DEFAULT_ENGLISH_WORDS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "english_words.txt")
+
+SNAPSHOT_VERSION = 2
+OPENING_BOOK_VERSION = 3
+POLICY_VERSION = 3
+# Stacked candidates per vectorized EIG pass of get_next_guess_batch
+EIG_BATCH_ROWS = 1 << 16
+
+# ---------- Affix rules ----------
+# fragment -> {letters: raw bonus}. Suffix fragments are matched against the
+# end of a word pattern and prefix fragments against its start ('_' = blank);
+# every letter in a key gets the bonus. Contains fragments may appear anywhere.
+# The summed bonus is capped at AFFIX_MAX_BONUS and normalized to [0,1].
+AFFIX_SUFFIX_RULES = {
+    "i__": {"n": 6, "o": 3},    # toward "ing" / "ion"
+    "in_": {"g": 7},            # in_ -> ing
+    "_io": {"n": 6},            # _io -> n (..nion)
+    "ti_": {"o": 5},            # ti_ -> tio (..tion)
+    "tio": {"n": 6},            # tio -> tion
+    "__d": {"e": 4},            # __d -> _ e d
+    "_ed": {"trnsl": 3},        # often consonant before -ed
+    "_er": {"tnrlds": 3},
+    "_ly": {"ble": 3},
+    "ou_": {"s": 5},            # ...ous
+    "me_": {"n": 4},            # ...ment
+    "men_": {"t": 5},
+    "ab_": {"l": 4},            # ...able
+    "abl_": {"e": 4},
+    "iv_": {"e": 4},            # ...ive
+    "avi": {"o": 3},            # avio(n)
+}
+AFFIX_PREFIX_RULES = {
+    "pre_": {"smt": 3},
+    "dis_": {"cpt": 3},
+    "uni_": {"tfn": 2},
+    "air_": {"cfst": 2},        # aviation-ish chunks
+    "aer_": {"od": 2},
+}
+AFFIX_CONTAINS_RULES = {
+    "q": {"u": 7},
+    "__": {"lnrstm": 3},        # encourage double consonants
+}
+AFFIX_MAX_BONUS = 10.0
+# Mined fragment tables (mine_affixes.py) add AFFIX_MINED_SCALE * P(letter | fragment)
+AFFIX_MINED_SCALE = 10.0
+AFFIX_TABLE_VERSION = 1
+
+# Columns of HangmanSolver._eig_features, weighted by eig_weights (alpha..eta)
+EIG_FEATURES = ("eig", "letter_prior", "position", "left_bigram", "right_bigram", "affix")
+
+def weighted_scores(features, weights):
+    """
+    Scores of every row of a letters x EIG_FEATURES matrix: letters for one
+    weight vector, letters x policies for a policies x 6 weight matrix. The
+    terms are added in the same order for either, so a letter scores exactly
+    the same alone or batched.
+    """
+    w = np.asarray(weights, dtype=np.float64)
+    cols = w.T if w.ndim == 2 else w
+    score = features[:, :1] * cols[0] if w.ndim == 2 else features[:, 0] * cols[0]
+    for j in range(1, len(EIG_FEATURES)):
+        score = score + (features[:, j:j + 1] if w.ndim == 2 else features[:, j]) * cols[j]
+    return score
+
+def policy_key(pattern, guessed):
+    """Hash key of a single-word state in the policy table, e.g. 'a__l_e|aelr'."""
+    return pattern + "|" + "".join(sorted(guessed))
+
+class GameState:
+    """
+    Per-game state carried between turns (see HangmanSolver.incremental). The
+    solver keeps one for the CLI; concurrent games each pass their own to
+    get_next_guess, so one solver can serve them from several threads.
+    """
+
+    def __init__(self):
+        self.guessedLetters = set()
+        self.currentWordState = ""
+        self.guessesRemaining = 6
+        # [(word_pattern, guessed_letters, candidate_ids)] from the previous turn
+        self.per_word = []
+        # (word_index, pattern, letter, candidate_ids, reveal_masks) for the last EIG guess
+        self.partition = None
+
+    def nbytes(self):
+        """Bytes of candidate ids and reveal masks held for the next turn."""
+        total = sum(ids.nbytes for _, _, ids in self.per_word)
+        if self.partition:
+            total += self.partition[3].nbytes + self.partition[4].nbytes
+        return total
 
 class HangmanSolver:
-    def __init__(self, airline_dict_path=None, multiword_mode=True):
-        # Load nltk words (general English dictionary)
-        self.word_list = {w.lower() for w in nltk_words.words() if w.isalpha()}
+    def __init__(self, airline_dict_path=None, multiword_mode=True, incremental=True,
+                 opening_book_path=None, policy_path=None, affix_table_path=None,
+                 snapshot_path=None, english_words_path=None):
+        self.multiword_mode = multiword_mode
+        self.english_words_path = english_words_path or DEFAULT_ENGLISH_WORDS
+        if not os.path.exists(self.english_words_path):
+            refresh_english_words(self.english_words_path)
+        # Keep per-word candidates between turns and narrow them instead of
+        # refiltering the dictionary (falls back to a full filter whenever the
+        # new state does not refine the previous one).
+        self.incremental = incremental
+
+        # Dictionary, indexes and priors come from the snapshot when its
+        # fingerprint still matches the source dictionaries.
+        self.source_fingerprint = self._source_fingerprint(airline_dict_path)
+        if not (snapshot_path and self._load_snapshot(snapshot_path, self.source_fingerprint)):
+            self._build_dictionary(airline_dict_path)
+            if snapshot_path:
+                self._save_snapshot(snapshot_path, self.source_fingerprint)
+
+        # alpha..eta for EIG, letter prior, position, left/right bigram, affix
+        # (tuned with grid_search_weights.py)
+        self.eig_weights = (0.4, 0.25, 0.15, 0.05, 0, 0.15)
+        self._compile_affix_rules(affix_table_path)
+        self.opening_book = self._load_opening_book(opening_book_path) if opening_book_path else {}
+        self.policy = self._load_policy(policy_path) if policy_path else {}
+        # the book and policy were checked against these weights
+        self._table_weights = self.eig_weights
+        self.reset()
+
+    def _build_dictionary(self, airline_dict_path):
+        """Merge the dictionaries into the columnar dictionary and build the priors."""
+        # Load the general English dictionary (see refresh_english_words)
+        with open(self.english_words_path, "r", encoding="utf-8") as f:
+            word_set = {w.strip().lower() for w in f if w.strip().isalpha()}
 
         # Merge airline dictionary if provided
         if airline_dict_path:
             with open(airline_dict_path, "r", encoding="utf-8") as f:
                 airline_words = {w.strip().lower() for w in f if w.strip()}
-            self.word_list |= airline_words  
+            word_set |= airline_words
 
-        self.word_list = list(self.word_list)
-        self.multiword_mode = multiword_mode
+        # One fixed-width matrix per word length plus letter bitmaps, so
+        # filtering a word pattern only ever looks at words of the right
+        # length and works on word ids rather than strings. Entries such as
+        # "o'hare" or "air-side" have no a-z code for every position, so
+        # they are left out of the matrices and the priors.
+        self.dictionary = ColumnarDictionary.from_words(sorted(w for w in word_set if w.isascii() and w.isalpha()))
+        self._build_priors(self.dictionary)
 
-        self._build_priors(self.word_list)
-        self.reset()
+    @cached_property
+    def words_by_len(self):
+        """Words per length as strings, decoded on first use (for the offline tools)."""
+        return {length: self.dictionary.words(length) for length in self.dictionary.lengths}
+
+    @cached_property
+    def word_list(self):
+        return [w for bucket in self.words_by_len.values() for w in bucket]
+
+    # ---------- Snapshot ----------
+    def _source_fingerprint(self, airline_dict_path):
+        """Hash of the snapshot format and the raw bytes of every source dictionary."""
+        h = hashlib.sha1(f"snapshot-v{SNAPSHOT_VERSION}".encode())
+        for path in (self.english_words_path, airline_dict_path):
+            if path:
+                with open(path, "rb") as f:
+                    h.update(f.read())
+        return h.hexdigest()
+
+    def _save_snapshot(self, path, fingerprint):
+        """Write the columnar dictionary and the priors to one memory-mappable file."""
+        priors = {
+            "letter_prior": self.letter_prior,
+            "pos_prior": self.pos_prior,
+            "left_bigram": self.left_bigram,
+            "right_bigram": self.right_bigram,
+        }
+        self.dictionary.save(path, extra=priors,
+                             meta={"snapshotVersion": SNAPSHOT_VERSION, "fingerprint": fingerprint})
+
+    def _load_snapshot(self, path, fingerprint):
+        """
+        Map a snapshot written by _save_snapshot; False if missing or stale.
+        The words, bitmaps and priors stay in the shared file pages.
+        """
+        try:
+            dictionary = ColumnarDictionary.open(path)
+        except (OSError, ValueError):
+            return False
+        meta = dictionary.meta
+        if meta.get("snapshotVersion") != SNAPSHOT_VERSION or meta.get("fingerprint") != fingerprint:
+            return False
+
+        self.dictionary = dictionary
+        self.letters = [chr(c) for c in range(ord('a'), ord('z')+1)]
+        for name in ("letter_prior", "pos_prior", "left_bigram", "right_bigram"):
+            setattr(self, name, dictionary.arrays[name])
+        return True
 
     def reset(self):
-        self.guessedLetters = set()
-        self.currentWordState = ""
-        self.guessesRemaining = 6
+        self.state = self.new_state()
 
-    def _build_priors(self, words):
+    def new_state(self):
+        """A fresh GameState, for one more game played concurrently with this solver."""
+        return GameState()
+
+    def _build_priors(self, dictionary):
+        """
+        Dense float32 priors with integer-coded letters (a-z = 0-25, '^' = 26,
+        '$' = 27, see BOUNDARY_CODES):
+          letter_prior[letter]
+          pos_prior[length, pos, letter]      (zeros for unseen lengths)
+          left_bigram[left, letter]           (left may be '^' = word start)
+          right_bigram[letter, right]         (right may be '$' = word end)
+        """
         self.letters = [chr(c) for c in range(ord('a'), ord('z')+1)]
-        self.letter_prior = Counter()
-        self.pos_prior = defaultdict(lambda: defaultdict(Counter))
-        self.left_bigram = defaultdict(Counter)
-        self.right_bigram = defaultdict(Counter)
-    
-        for w in words:
-            for i, ch in enumerate(w):
-                self.letter_prior[ch] += 1
-                self.pos_prior[len(w)][i][ch] += 1
-                if i > 0:
-                    self.left_bigram[w[i-1]][ch] += 1
-                else:
-                    self.left_bigram["^"][ch] += 1   # <-- start boundary
-                if i < len(w)-1:
-                    self.right_bigram[ch][w[i+1]] += 1
-                else:
-                    self.right_bigram[ch]["$"] += 1  # <-- end boundary
-    
-        def norm(counter):
-            total = sum(counter.values()) or 1
-            return {k: v/total for k, v in counter.items()}
-    
+        max_len = max(dictionary.lengths, default=0)
+
+        letter_counts = np.zeros(26)
+        pos_counts = np.zeros((max_len + 1, max_len + 1, 26))
+        left_counts = np.zeros((28, 28))
+        right_counts = np.zeros((28, 28))
+
+        for length in dictionary.lengths:
+            codes = dictionary.matrix(length).astype(np.int64) - ord("a")
+            letter_counts += np.bincount(codes.ravel(), minlength=26)
+            for pos in range(length):
+                pos_counts[length, pos] += np.bincount(codes[:, pos], minlength=26)
+            # neighbouring letter pairs, plus the start/end boundaries
+            pairs = np.bincount((codes[:, :-1] * 28 + codes[:, 1:]).ravel(), minlength=28 * 28).reshape(28, 28)
+            left_counts += pairs
+            right_counts += pairs
+            left_counts[26, :26] += np.bincount(codes[:, 0], minlength=26)   # <-- start boundary
+            right_counts[:26, 27] += np.bincount(codes[:, -1], minlength=26)  # <-- end boundary
+
+        def norm(counts):
+            total = counts.sum(axis=-1, keepdims=True)
+            return (counts / np.where(total == 0, 1, total)).astype(np.float32)
+
         # Normalize everything
-        self.letter_prior = norm(self.letter_prior)
-    
-        self.pos_prior = {
-            length: {
-                pos: norm(counter) for pos, counter in pos_dict.items()
-            } for length, pos_dict in self.pos_prior.items()
-        }
-    
-        self.left_bigram = {left: norm(counter) for left, counter in self.left_bigram.items()}
-        self.right_bigram = {ch: norm(counter) for ch, counter in self.right_bigram.items()}
+        self.letter_prior = norm(letter_counts)
+        self.pos_prior = norm(pos_counts)
+        self.left_bigram = norm(left_counts)
+        self.right_bigram = norm(right_counts)
+
+    def _blank_context(self, pattern, blanks_idx):
+        """Left/right neighbour codes of each blank; '_' neighbours become '^'/'$'."""
+        left_codes, right_codes = [], []
+        for i in blanks_idx:
+            left = pattern[i-1] if i > 0 and pattern[i-1] != "_" else "^"
+            right = pattern[i+1] if i < len(pattern)-1 and pattern[i+1] != "_" else "$"
+            # other unknown characters have no bigram statistics
+            if left in BOUNDARY_CODES:
+                left_codes.append(BOUNDARY_CODES[left])
+            if right in BOUNDARY_CODES:
+                right_codes.append(BOUNDARY_CODES[right])
+        return left_codes, right_codes
+
+    def _pos_prior_for(self, pattern, blanks_idx):
+        """Sum of positional priors over the blanks, as a 26-wide vector."""
+        if len(pattern) >= self.pos_prior.shape[0]:
+            return np.zeros(26, dtype=np.float32)
+        return self.pos_prior[len(pattern), blanks_idx].sum(axis=0)
+
+    def config_fingerprint(self, weights=True):
+        """
+        Hash of everything the solver's guesses depend on: the source
+        dictionaries, eig_weights, the AFFIX_* rules and the mined affix
+        table. Opening books and policies record the fingerprint of the solver
+        that built them and are only served by a solver with the same one.
+        weights=False leaves eig_weights out, for data that holds for any
+        weights (the tuner's feature cache).
+        """
+        rules = [AFFIX_SUFFIX_RULES, AFFIX_PREFIX_RULES, AFFIX_CONTAINS_RULES, AFFIX_MAX_BONUS, AFFIX_MINED_SCALE]
+        if weights:
+            rules.insert(0, self.eig_weights)
+        h = hashlib.sha1(self.source_fingerprint.encode())
+        h.update(json.dumps(rules, sort_keys=True).encode())
+        h.update(self._affix_table_sha1.encode())
+        return h.hexdigest()
+
+    # ---------- Opening book ----------
+    def _load_opening_book(self, path):
+        """
+        Load first guesses precomputed by build_opening_book.py. The book maps a
+        word-length signature like "8 7" to the solver's guesses while every
+        earlier guess missed, e.g. "es". Books built by a solver with a
+        different dictionary, weights or affix rules are ignored.
+        """
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != OPENING_BOOK_VERSION or data.get("config") != self.config_fingerprint():
+            print(f"Ignoring opening book {path}: built for a different dictionary or configuration",
+                  file=sys.stderr)
+            return {}
+        return data["book"]
+
+    def _opening_book_guess(self, words_state, guessed):
+        """Book move for a fully blank state, or None if the book doesn't cover it."""
+        if not self.opening_book or any(ch != "_" for w in words_state for ch in w):
+            return None
+        line = self.opening_book.get(" ".join(str(len(w)) for w in words_state))
+        if not line or len(guessed) >= len(line) or guessed != set(line[:len(guessed)]):
+            return None
+        return line[len(guessed)]
+
+    # ---------- Precompiled policy ----------
+    def _load_policy(self, path):
+        """
+        Load the per-length decision tree written by build_policy.py: every
+        in-dictionary single-word state the solver can reach, mapped to its
+        guess. Policies built by a solver with a different dictionary,
+        weights or affix rules are ignored (see config_fingerprint).
+        """
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != POLICY_VERSION or data.get("config") != self.config_fingerprint():
+            print(f"Ignoring policy {path}: built for a different dictionary or configuration", file=sys.stderr)
+            return {}
+        return data["policy"]
 
     # ---------- Candidate machinery ----------
     def filter_candidates_one_word(self, word_pattern, guessed):
         """Return candidates for ONE word-pattern like '_la_k_o_' (no spaces)."""
-        regex = "^" + word_pattern.replace("_", "[a-z]") + "$"
-        blanks_idx = [i for i, ch in enumerate(word_pattern) if ch == "_"]
-        fixed_idx = [(i, ch) for i, ch in enumerate(word_pattern) if ch != "_"]
+        ids = self.dictionary.filter_ids(word_pattern, guessed)
+        return self.dictionary.words(len(word_pattern), ids)
 
-        cands = []
-        for w in self.word_list:
-            if len(w) != len(word_pattern):
-                continue
-            if not re.match(regex, w):
-                continue
-            # reject words containing letters known to be absent anywhere
-            # (i.e., letters guessed but not present in revealed pattern)
-            if any(g in w for g in guessed if g not in word_pattern):
-                continue
-            # enforce fixed positions explicitly (redundant with regex, but cheap)
-            ok = True
-            for i, ch in fixed_idx:
-                if w[i] != ch:
-                    ok = False
-                    break
-            if not ok:
+    def _narrow_candidates(self, prev, word_pattern, guessed):
+        """
+        Narrow last turn's candidate ids for one word to a refined pattern.
+        Returns None if the new pattern/guessed letters do not refine the old ones.
+        """
+        old_pattern, old_guessed, old_ids = prev
+        new_guessed = guessed - old_guessed
+        if len(old_pattern) != len(word_pattern):
+            return None
+        new_fixed = []
+        for i, (old_ch, ch) in enumerate(zip(old_pattern, word_pattern)):
+            if old_ch == ch:
                 continue
-            cands.append(w)
-        # print(cands)
-        return cands
-    
+            if old_ch != "_" or ch not in new_guessed:
+                return None  # not a reveal of a newly guessed letter: different game
+            new_fixed.append((i, ch))
+        if not new_guessed:
+            return old_ids
+
+        chars = self.dictionary.matrix(len(word_pattern))[old_ids]
+        keep = np.ones(len(old_ids), dtype=bool)
+        for i, ch in new_fixed:
+            keep &= chars[:, i] == ord(ch)
+        # words containing newly guessed letters that were not revealed
+        for g in new_guessed - set(word_pattern):
+            keep &= ~(chars == ord(g)).any(axis=1)
+        return old_ids[keep]
+
+    def _candidates_for_state(self, words_state, guessed, state):
+        """Candidate word ids per word of the phrase, reusing the previous turn when possible."""
+        prev = state.per_word if self.incremental else []
+        if len(prev) != len(words_state) or not state.guessedLetters <= guessed:
+            prev = []
+        partition, state.partition = state.partition, None
+
+        per_word = []
+        for idx, wpat in enumerate(words_state):
+            ids = None
+            if prev and partition and partition[0] == idx:
+                ids = self._lookup_partition(partition, wpat, guessed - state.guessedLetters)
+            if prev and ids is None and len(prev[idx][2]) * 8 <= len(self.dictionary.matrix(len(wpat))):
+                # narrowing copies the survivors' rows, so only worth it once
+                # they are a small part of the length bucket
+                ids = self._narrow_candidates(prev[idx], wpat, guessed)
+            if ids is None:
+                ids = self.dictionary.filter_ids(wpat, guessed)
+            per_word.append((wpat, guessed, ids))
+
+        state.per_word = per_word
+        state.guessedLetters = set(guessed)
+        state.currentWordState = " ".join(words_state)
+        return [(wpat, ids) for wpat, _, ids in per_word]
+
+    def _remember_partition(self, state, idx, pattern, ids, chars, letter):
+        """
+        Keep the candidate ids of word `idx` together with their reveal mask for
+        `letter`. Whatever the outcome of guessing `letter`, next turn's
+        candidates for this word are exactly the ones whose mask covers the
+        observed reveal, found by _lookup_partition.
+        """
+        masks = self._reveal_masks(pattern, chars, [letter])
+        if masks is not None:
+            state.partition = (idx, pattern, letter, ids, masks[0])
+
+    def _lookup_partition(self, partition, word_pattern, new_guessed):
+        """Candidate ids for a word from the stored partition, or None if it doesn't apply."""
+        _, old_pattern, letter, ids, masks = partition
+        if new_guessed != {letter} or len(old_pattern) != len(word_pattern):
+            return None
+        mask, bit = 0, 1
+        for old_ch, ch in zip(old_pattern, word_pattern):
+            if old_ch == "_":
+                if ch == letter:
+                    mask |= bit
+                elif ch != "_":
+                    return None
+                bit <<= 1
+            elif old_ch != ch:
+                return None
+        # the letter is at least where it was revealed; blanks may hold it too,
+        # like in filter_ids. A miss (mask 0) rules it out everywhere.
+        return ids[(masks & mask) == mask] if mask else ids[masks == 0]
+
     def _split_state(self, currentWordState):
         # Preserve spaces; split into words
         return [w for w in currentWordState.lower().split(" ") if w != ""]
 
     # ---------- EIG tie-break on most constrained word ----------
-    def _eig_letter_for_word(self, pattern, candidates, guessed):
-        """Pick letter using EIG + priors + affix/orthographic heuristics."""
+    def _reveal_masks(self, pattern, chars, letters):
+        """
+        Reveal mask of every letter for every candidate as a letters x candidates
+        int64 array (bit j set = j-th blank of `pattern` holds the letter).
+        `chars` is the candidates x len(pattern) uint8 matrix of candidate
+        words, so all letters are handled at once. Returns None when the
+        blanks don't fit in an int64.
+        """
         blanks_idx = [i for i, ch in enumerate(pattern) if ch == "_"]
-        if not blanks_idx or not candidates:
+        if len(blanks_idx) > 62:
             return None
 
-        remaining_letters = set(ch for w in candidates for ch in w) - guessed
+        blank_cols = chars[:, blanks_idx]
+        codes = np.frombuffer("".join(letters).encode("ascii"), dtype=np.uint8)
+
+        hits = blank_cols[None, :, :] == codes[:, None, None]          # letters x k x blanks
+        place = np.left_shift(1, np.arange(len(blanks_idx), dtype=np.int64))
+        return (hits * place).sum(axis=2)
+
+    def _eig_bucket_sums(self, pattern, chars, letters):
+        """
+        For every letter, bucket the candidates (rows of `chars`) by the
+        letter's reveal mask over the blanks of `pattern` and return
+        sum(bucket_size ** 2) per letter.
+        """
+        masks = self._reveal_masks(pattern, chars, letters)
+        if masks is None:
+            # masks no longer fit in int64; bucket whole reveal rows instead
+            blank_cols = chars[:, [i for i, ch in enumerate(pattern) if ch == "_"]]
+            sums = []
+            for l in letters:
+                _, sizes = np.unique(blank_cols == ord(l), axis=0, return_counts=True)
+                sums.append(int((sizes * sizes).sum()))
+            return sums
+
+        k = len(chars)
+        masks.sort(axis=1)
+
+        # Equal masks are now adjacent; every row starts a new run, so runs
+        # never cross rows in the flattened view.
+        starts = np.ones(masks.shape, dtype=bool)
+        starts[:, 1:] = masks[:, 1:] != masks[:, :-1]
+        run_starts = np.flatnonzero(starts)
+        run_sizes = np.diff(np.append(run_starts, masks.size))
+        sums = np.bincount(run_starts // k, weights=run_sizes * run_sizes, minlength=len(letters))
+        return [int(sq) for sq in sums]
+
+    def _eig_letter_for_word(self, pattern, chars, guessed):
+        """
+        Pick letter using EIG + priors + affix/orthographic heuristics.
+        `chars` holds the candidate words as a uint8 matrix, one per row.
+        """
+        blanks_idx = [i for i, ch in enumerate(pattern) if ch == "_"]
+        if not blanks_idx or not len(chars):
+            return None
+
+        present = {chr(c) for c in np.flatnonzero(np.bincount(chars.ravel(), minlength=128))}
+        letters = self._eig_letters(present, guessed)
+        if not letters:
+            return None
+        return self._eig_choose(pattern, letters, self._eig_bucket_sums(pattern, chars, letters), len(chars))
+
+    def _eig_letters(self, present, guessed):
+        """Sorted letters EIG picks from: unguessed letters of the candidates, else any unguessed letter."""
+        remaining_letters = set(present) - guessed
         if not remaining_letters:
             remaining_letters = set(self.letters) - guessed
-        # print(pattern)
-        # print(remaining_letters)
-        best_letter, best_score = None, -1.0
-        total = len(candidates)
-
-        # Weights – tune later
-        alpha, beta, gamma, delta, epsilon, eta = 0.4, 0.25, 0.15, 0.05, 0, 0.15
-
-        for l in remaining_letters:
-            # --- EIG ---
-            buckets = Counter()
-            for w in candidates:
-                mask_bits = ["1" if w[i] == l else "0" for i in blanks_idx]
-                buckets["".join(mask_bits)] += 1
-            expected_remaining = sum(sz * sz for sz in buckets.values()) / total
-            eig_score = 1.0 - (expected_remaining / total)  # normalize so bigger = better
-            # print(eig_score, expected_remaining, total)
-            # --- Priors ---
-            lp = self.letter_prior.get(l, 0.0)
-            # print(lp)
-            pos_score = 0.0
-            for i in blanks_idx:
-                pos_score += self.pos_prior[len(pattern)][i].get(l, 0.0)
-            # print(pos_score)
-            left_bigram_score = 0.0
-            right_bigram_score = 0.0
-            for i in blanks_idx:
-                left = pattern[i-1] if i > 0 and pattern[i-1] != "_" else "^"
-                right = pattern[i+1] if i < len(pattern)-1 and pattern[i+1] != "_" else "$"
-                left_bigram_score += self.left_bigram[left].get(l, 0.0)
-                right_bigram_score += self.right_bigram[l].get(right, 0.0)
-            # print(left, right)
-            affix_score = self._affix_bonus(l, pattern)
-
-            # --- Combined ---
-            score = alpha*eig_score + beta*lp + gamma*pos_score + delta*left_bigram_score + epsilon*right_bigram_score + eta*affix_score
-            # print("letter-> ", l, "scores ->", score, eig_score, lp, pos_score, left_bigram_score, right_bigram_score, affix_score)
-
-            if score > best_score:
-                best_score, best_letter = score, l
-        # print(best_letter)
-        return best_letter
-
-    # New helper for affix / orthographic bonus
-    def _affix_bonus(self, letter, pattern):
+        return sorted(l for l in remaining_letters if l in LETTER_CODES)
+
+    def _eig_choose(self, pattern, letters, bucket_sums, total):
+        """Best of `letters` given their EIG bucket sums over `total` candidates, priors and affixes."""
+        # ties go to the alphabetically first letter
+        features = self._eig_features(pattern, letters, bucket_sums, total)
+        return letters[int(np.argmax(weighted_scores(features, self.eig_weights)))]
+
+    def _eig_features(self, pattern, letters, bucket_sums, total):
         """
-        Proactive + reactive affix/orthographic bonus, normalized to [0,1].
-        Rewards letters that would COMPLETE common affixes given the current
-        pattern with blanks. Also keeps a few reactive rules (like 'q' -> 'u').
+        letters x 6 matrix of the scores eig_weights combine, in EIG_FEATURES
+        order. None of them depends on the weights.
         """
-        b = 0
-    
-        s = pattern  # alias
-    
-        # -------- Proactive suffix completions --------
-        # ...ing
-        if len(s) >= 3:
-            tail3 = s[-3:]
-            if tail3 == "i__":
-                if letter == "n": b += 6   # i__ -> i n _  (toward "ing")
-                if letter == "o": b += 3   # i__ -> i o _  (toward "ion")
-            if tail3 == "in_":
-                if letter == "g": b += 7   # in_ -> ing
-    
-            # ...ion
-            if tail3 == "_io":
-                if letter == "n": b += 6   # _io -> n (..nion)
-            if tail3 == "ti_":
-                if letter == "o": b += 5   # ti_ -> tio (..tion)
-            if tail3 == "tio":
-                if letter == "n": b += 6   # tio -> tion
-    
-            # ...ed
-            if tail3 == "__d":
-                if letter == "e": b += 4   # __d -> _ e d
-            if tail3 == "_ed":
-                # often consonant before -ed
-                if letter in "trnsl": b += 3
-    
-            # ...er
-            if tail3 == "_er":
-                if letter in "tnrlds": b += 3
-    
-            # ...ly
-            if tail3 == "_ly":
-                if letter in "ble": b += 3
-    
-            # ...ous
-            if tail3 == "ou_":
-                if letter == "s": b += 5
-    
-            # ...ment
-            if tail3 == "me_":
-                if letter == "n": b += 4
-            if len(s) >= 4 and s[-4:] == "men_":
-                if letter == "t": b += 5
-    
-            # ...able
-            if tail3 == "ab_":
-                if letter == "l": b += 4
-            if len(s) >= 4 and s[-4:] == "abl_":
-                if letter == "e": b += 4
-    
-            # ...ive
-            if tail3 == "iv_":
-                if letter == "e": b += 4
-    
-        # -------- Proactive prefix completions --------
-        if len(s) >= 3:
-            head3 = s[:3]
-            if head3 == "pre":
-                if len(s) > 3 and s[3] == "_":
-                    if letter in "smt": b += 3  # pre_...
-            if head3 == "dis":
-                if len(s) > 3 and s[3] == "_":
-                    if letter in "cpt": b += 3  # dis_...
-            if head3 == "uni":
-                if len(s) > 3 and s[3] == "_":
-                    if letter in "tfn": b += 2  # uni_...
-    
-        # Aviation-ish common chunks (light, generic heuristics)
-        # avio(n), air_, aero_, auto_
-        if len(s) >= 3 and s[-3:] == "avi":
-            if letter == "o": b += 3
-        if s.startswith("air") and len(s) > 3 and s[3] == "_":
-            if letter in "cfst": b += 2
-        if s.startswith("aer") and len(s) > 3 and s[3] == "_":
-            if letter in "od": b += 2
-    
-        # -------- Orthographic / reactive helpers --------
-        if "q" in s and letter == "u":
-            b += 7
-        # Encourage double consonants when we see "__" (somewhere)
-        if "__" in s and letter in "lnrstm":
-            b += 3
-    
+        blanks_idx = [i for i, ch in enumerate(pattern) if ch == "_"]
+        codes = [LETTER_CODES[l] for l in letters]
+
+        # --- EIG ---
+        expected_remaining = np.asarray(bucket_sums, dtype=np.float64) / total
+        eig_score = 1.0 - (expected_remaining / total)  # normalize so bigger = better
+
+        # --- Priors ---
+        lp = self.letter_prior[codes]
+        pos_score = self._pos_prior_for(pattern, blanks_idx)[codes]
+        left_codes, right_codes = self._blank_context(pattern, blanks_idx)
+        left_bigram_score = self.left_bigram[left_codes][:, codes].sum(axis=0)
+        right_bigram_score = self.right_bigram[codes][:, right_codes].sum(axis=1)
+        affix_score = self._affix_bonus_vector(pattern)[codes]
+
+        return np.column_stack([eig_score, lp, pos_score, left_bigram_score, right_bigram_score,
+                                affix_score]).astype(np.float64)
+
+    def _eig_batch(self, length, jobs):
+        """
+        EIG letters for many {(pattern, guessed): candidate_ids} jobs whose words
+        all have `length` letters. The jobs' candidates are stacked into one
+        matrix and bucketed by (job, reveal mask) for all 26 letters in one pass.
+        Masks cover the whole word: revealed positions hold the same letter in
+        every candidate of a job, so the buckets match masks over the blanks.
+        """
+        items = list(jobs.items())
+        matrix = self.dictionary.matrix(length)
+        if length > 40:
+            # job numbers and masks would no longer fit in an int64 together
+            return {(pattern, guessed): self._eig_letter_for_word(pattern, matrix[ids], guessed)
+                    for (pattern, guessed), ids in items}
+
+        results = {}
+        start = 0
+        while start < len(items):
+            # as many jobs as fit in EIG_BATCH_ROWS stacked candidates (at least one)
+            stop, rows = start + 1, len(items[start][1])
+            while stop < len(items) and rows + len(items[stop][1]) <= EIG_BATCH_ROWS:
+                rows += len(items[stop][1])
+                stop += 1
+            chunk, start = items[start:stop], stop
+
+            sizes = np.array([len(ids) for _, ids in chunk])
+            chars = matrix[np.concatenate([ids for _, ids in chunk])]
+            job = np.repeat(np.arange(len(chunk), dtype=np.int64), sizes)
+
+            # every position holds exactly one letter, so set its bit in that
+            # letter's mask row only (rows are distinct within one position)
+            letter_idx = chars.astype(np.intp) - ord("a")
+            row_idx = np.arange(rows)
+            masks = np.zeros((26, rows), dtype=np.int64)
+            for pos in range(length):
+                masks[letter_idx[:, pos], row_idx] |= 1 << pos
+            keys = masks | (job << length)
+            keys.sort(axis=1)
+            starts = np.ones(keys.shape, dtype=bool)
+            starts[:, 1:] = keys[:, 1:] != keys[:, :-1]
+            run_starts = np.flatnonzero(starts)
+            run_sizes = np.diff(np.append(run_starts, keys.size))
+            run_slot = (run_starts // rows) * len(chunk) + (keys.ravel()[run_starts] >> length)
+            sums = np.bincount(run_slot, weights=run_sizes * run_sizes, minlength=26 * len(chunk)).reshape(26, -1)
+            offsets = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+            present = np.logical_or.reduceat(masks != 0, offsets, axis=1)  # 26 x jobs
+
+            for j, ((pattern, guessed), _) in enumerate(chunk):
+                letters = self._eig_letters({self.letters[c] for c in np.flatnonzero(present[:, j])}, guessed)
+                if not letters:
+                    results[(pattern, guessed)] = None
+                    continue
+                bucket_sums = sums[[LETTER_CODES[l] for l in letters], j]
+                results[(pattern, guessed)] = self._eig_choose(pattern, letters, bucket_sums, int(sizes[j]))
+        return results
+
+    # ---------- Affix / orthographic bonus ----------
+    def _compile_affix_rules(self, affix_table_path=None):
+        """
+        Turn the AFFIX_* tables into 26-wide raw bonus vectors keyed by fragment,
+        and load the mined affix table from mine_affixes.py if one is given.
+        """
+        def compile_table(table):
+            compiled = {}
+            for fragment, bonuses in table.items():
+                vec = np.zeros(26)
+                for letters, bonus in bonuses.items():
+                    for ch in letters:
+                        vec[ord(ch) - ord("a")] += bonus
+                compiled[fragment] = vec
+            return compiled
+
+        self._suffix_rules = compile_table(AFFIX_SUFFIX_RULES)
+        self._prefix_rules = compile_table(AFFIX_PREFIX_RULES)
+        self._contains_rules = compile_table(AFFIX_CONTAINS_RULES)
+        self._suffix_lengths = sorted({len(f) for f in AFFIX_SUFFIX_RULES})
+        self._prefix_lengths = sorted({len(f) for f in AFFIX_PREFIX_RULES})
+        self._affix_cache = {}
+
+        # mined fragments ("^pre_", "_ing$", "ti_$") -> row of letter probabilities
+        self._mined_fragments = {}
+        self._mined_probs = None
+        self._mined_max_fragment = 0
+        self._affix_table_sha1 = ""
+        if affix_table_path:
+            with open(affix_table_path, "rb") as f:
+                self._affix_table_sha1 = hashlib.sha1(f.read()).hexdigest()
+            with np.load(affix_table_path) as table:
+                if int(table["version"]) != AFFIX_TABLE_VERSION:
+                    raise ValueError(f"Unsupported affix table version in {affix_table_path}")
+                self._mined_fragments = {f: i for i, f in enumerate(table["fragments"].tolist())}
+                self._mined_probs = table["probs"].astype(np.float32)
+                self._mined_max_fragment = int(table["max_fragment"])
+
+    def _mined_affix_rows(self, pattern):
+        """Rows of the mined affix table that apply to `pattern` (one dict lookup each)."""
+        k_max = self._mined_max_fragment
+        rows = []
+
+        # head: known letters, then the first blank
+        first_blank = pattern.find("_")
+        if 1 <= first_blank <= k_max:
+            rows.append(self._mined_fragments.get("^" + pattern[:first_blank + 1]))
+
+        if pattern.endswith("_"):
+            # tail: known letters, then a blank as the last letter (longest context first)
+            for k in range(min(k_max, len(pattern) - 1), 0, -1):
+                head = pattern[-k - 1:-1]
+                if "_" not in head and head + "_$" in self._mined_fragments:
+                    rows.append(self._mined_fragments[head + "_$"])
+                    break
+        else:
+            # tail: a blank right before a known suffix
+            tail = pattern.rstrip("abcdefghijklmnopqrstuvwxyz")
+            suffix = pattern[len(tail):]
+            if tail.endswith("_") and len(suffix) <= k_max:
+                rows.append(self._mined_fragments.get("_" + suffix + "$"))
+
+        return [r for r in rows if r is not None]
+
+    def _affix_bonus_vector(self, pattern):
+        """
+        Proactive + reactive affix/orthographic bonus for all 26 letters,
+        normalized to [0,1]. Rewards letters that would COMPLETE common affixes
+        given the current pattern with blanks (see AFFIX_SUFFIX_RULES and
+        AFFIX_PREFIX_RULES), plus a few reactive rules (like 'q' -> 'u').
+        """
+        cached = self._affix_cache.get(pattern)
+        if cached is not None:
+            return cached
+
+        b = np.zeros(26)
+        for n in self._suffix_lengths:
+            if len(pattern) >= n and pattern[-n:] in self._suffix_rules:
+                b += self._suffix_rules[pattern[-n:]]
+        for n in self._prefix_lengths:
+            if len(pattern) >= n and pattern[:n] in self._prefix_rules:
+                b += self._prefix_rules[pattern[:n]]
+        for fragment, vec in self._contains_rules.items():
+            if fragment in pattern:
+                b += vec
+        if self._mined_fragments:
+            for row in self._mined_affix_rows(pattern):
+                b += AFFIX_MINED_SCALE * self._mined_probs[row]
+
         # If the last revealed char is a consonant and end is '_' (C_), double?
-        if len(s) >= 2 and s[-1] == "_" and s[-2] != "_" and s[-2] not in "aeiou":
-            if letter == s[-2]:  # e.g., ...n_ -> suggest 'n'
-                b += 3
-    
+        if len(pattern) >= 2 and pattern[-1] == "_" and pattern[-2] != "_" and pattern[-2] not in "aeiou":
+            if "a" <= pattern[-2] <= "z":  # e.g., ...n_ -> suggest 'n'
+                b[ord(pattern[-2]) - ord("a")] += 3
+
         # -------- Normalize --------
-        MAX_BONUS = 10.0
-        if b < 0: b = 0
-        if b > MAX_BONUS: b = MAX_BONUS
-        return b / MAX_BONUS
+        bonus = np.clip(b, 0, AFFIX_MAX_BONUS) / AFFIX_MAX_BONUS
+        if len(self._affix_cache) > 100000:
+            self._affix_cache.clear()
+        self._affix_cache[pattern] = bonus
+        return bonus
+
+    def _affix_bonus(self, letter, pattern):
+        """Affix/orthographic bonus of one letter for `pattern`, in [0,1]."""
+        return self._affix_bonus_vector(pattern)[ord(letter) - ord("a")]
     
     # ---------- Smarter OOV fallback ----------
     def _oov_score_letter_for_phrase(self, words_state, guessed):
-        remaining_letters = set(self.letters) - guessed
-        best_letter, best_score = None, -1.0
+        """
+        Open-vocabulary score of every letter, summed over all blanks of the
+        phrase: each blank contributes a 26-wide vector of letter, positional
+        and left/right bigram priors, and each word its affix bonus vector.
+        """
+        remaining = np.array([l not in guessed for l in self.letters])
+        if not remaining.any():
+            return None
     
         alpha, beta, gamma, delta, epsilon, eta = 0.0, 0.2, 0.3, 0.2, 0.2, 0.1  # no EIG when OOV
+
+        score = np.zeros(26)
+        for w in words_state:
+            blanks_idx = [i for i, ch in enumerate(w) if ch == "_"]
+            if blanks_idx:
+                left_codes, right_codes = self._blank_context(w, blanks_idx)
+                score += len(blanks_idx) * beta * self.letter_prior
+                score += gamma * self._pos_prior_for(w, blanks_idx)
+                score += gamma * self.left_bigram[left_codes, :26].sum(axis=0)
+                score += epsilon * self.right_bigram[:26, right_codes].sum(axis=1)
     
-        for l in remaining_letters:
-            score = 0.0
-            for w in words_state:
-                for i, ch in enumerate(w):
-                    if ch != "_":
-                        continue
-    
-                    # replace "_" neighbors with boundary markers
-                    left = w[i-1] if i > 0 and w[i-1] != "_" else "^"
-                    right = w[i+1] if i < len(w)-1 and w[i+1] != "_" else "$"
-    
-                    lp = self.letter_prior.get(l, 0.0)
-                    pp = self.pos_prior[len(w)][i].get(l, 0.0)
-                    lb = self.left_bigram.get(left, {}).get(l, 0.0)
-                    rb = self.right_bigram.get(l, {}).get(right, 0.0)
-    
-                    score += beta*lp + gamma*pp + gamma*lb + epsilon*rb
-    
-                score += eta * self._affix_bonus(l, w)
-    
-            if score > best_score:
-                best_score, best_letter = score, l
+            score += eta * self._affix_bonus_vector(w)
     
-        return best_letter
+        return self.letters[int(np.where(remaining, score, -np.inf).argmax())]
 
-     # ---------- Public: next guess ----------
-    def get_next_guess(self, currentWordState, guessedLetters, guessesRemaining):
-        guessed = {g for g in (ch.lower().strip() for ch in guessedLetters) if len(g) == 1 and g.isalpha()}
-        words_state = self._split_state(currentWordState)
+    # ---------- Public: next guess ----------
+    def _normalize_guessed(self, guessedLetters):
+        return {g for g in (ch.lower().strip() for ch in guessedLetters) if len(g) == 1 and g.isalpha()}
 
-        # Build candidate sets per word
-        per_word = []
-        for wpat in words_state:
-            cands = self.filter_candidates_one_word(wpat, guessed)
-            per_word.append((wpat, cands))
-
-        # 1) If any word has exactly ONE candidate, force its missing letter
-        for wpat, cands in per_word:
-            if len(cands) == 1:
-                # print("one candidate left ", cands)
-                for ch in cands[0]:
-                    if ch not in guessed and "_" in wpat:
-                        # ensure it's actually filling a blank
-                        return {"nextGuess": ch, "status": "playing"}
+    def _table_guess(self, words_state, guessed):
+        """Guess from the precompiled policy or the opening book, or None."""
+        if self.eig_weights != self._table_weights:
+            return None  # the weights were changed after loading (e.g. while tuning)
 
-        # 2) If we have ANY candidates, use EIG on the most constrained word
-        constrained = [(wpat, cands) for (wpat, cands) in per_word if len(cands) > 0 and "_" in wpat]
+        # 0) Single in-dictionary words: one lookup in the precompiled policy
+        if self.policy and len(words_state) == 1:
+            policy_letter = self.policy.get(policy_key(words_state[0], guessed))
+            if policy_letter:
+                return policy_letter
 
-        if constrained:
-            # choose the word with the fewest candidates
-            wpat, cands = min(constrained, key=lambda t: len(t[1]))
+        # Opening moves depend only on the word lengths: serve them from the book
+        return self._opening_book_guess(words_state, guessed)
 
-            eig_letter = self._eig_letter_for_word(wpat, cands, guessed)
-            if eig_letter and eig_letter not in guessed:
-                return {"nextGuess": eig_letter, "status": "playing"}
+    def _single_candidate_letter(self, per_word, guessed):
+        """1) If any word has exactly ONE candidate, force its missing letter."""
+        for wpat, ids in per_word:
+            if len(ids) == 1:
+                for ch in self.dictionary.words(len(wpat), ids)[0]:
+                    if ch not in guessed and "_" in wpat:
+                        # ensure it's actually filling a blank
+                        return ch
+        return None
 
-            # fallback to frequency within ALL candidates if eig returns None
-            freq = Counter()
-            for _, cset in constrained:
-                for w in cset:
-                    for ch in set(w):
-                        if ch not in guessed:
-                            freq[ch] += 1
-            if freq:
-                return {"nextGuess": freq.most_common(1)[0][0], "status": "playing"}
+    def _constrained_words(self, per_word):
+        """(index, pattern, candidate_ids) of the unsolved words that have candidates."""
+        return [(idx, wpat, ids) for idx, (wpat, ids) in enumerate(per_word) if len(ids) > 0 and "_" in wpat]
+
+    def _fallback_guess(self, words_state, constrained, guessed):
+        """Guess when EIG has no letter: candidate frequency, then OOV priors, then static order."""
+        # fallback to frequency within ALL candidates if eig returns None
+        freq = Counter()
+        for _, cpat, cids in constrained:
+            cchars = self.dictionary.matrix(len(cpat))[cids]
+            for ch in self.letters:
+                count = int((cchars == ord(ch)).any(axis=1).sum())
+                if count and ch not in guessed:
+                    freq[ch] += count
+        if freq:
+            return {"nextGuess": freq.most_common(1)[0][0], "status": "playing"}
 
         # 3) OOV fallback: open-vocab priors (positional + bigrams + global)
         oov_letter = self._oov_score_letter_for_phrase(words_state, guessed)
@@ -340,6 +766,141 @@ class HangmanSolver:
 
         return {"nextGuess": "", "status": "reset"}
 
+    def get_next_guess(self, currentWordState, guessedLetters, guessesRemaining, state=None):
+        """
+        Next guess for a game state. `state` is the GameState of this game when
+        several games share the solver; by default the solver's own is used.
+        """
+        state = state or self.state
+        guessed = self._normalize_guessed(guessedLetters)
+        words_state = self._split_state(currentWordState)
+
+        table_letter = self._table_guess(words_state, guessed)
+        if table_letter:
+            return {"nextGuess": table_letter, "status": "playing"}
+
+        # Build candidate sets per word (narrowed from last turn if possible)
+        per_word = self._candidates_for_state(words_state, guessed, state)
+
+        forced_letter = self._single_candidate_letter(per_word, guessed)
+        if forced_letter:
+            return {"nextGuess": forced_letter, "status": "playing"}
+
+        # 2) If we have ANY candidates, use EIG on the most constrained word
+        constrained = self._constrained_words(per_word)
+
+        if constrained:
+            # choose the word with the fewest candidates
+            idx, wpat, ids = min(constrained, key=lambda t: len(t[2]))
+            chars = self.dictionary.matrix(len(wpat))[ids]
+
+            eig_letter = self._eig_letter_for_word(wpat, chars, guessed)
+            if eig_letter and eig_letter not in guessed:
+                if self.incremental:
+                    self._remember_partition(state, idx, wpat, ids, chars, eig_letter)
+                return {"nextGuess": eig_letter, "status": "playing"}
+
+        return self._fallback_guess(words_state, constrained, guessed)
+
+    def guess_features(self, currentWordState, guessedLetters, state=None):
+        """
+        What get_next_guess decides before the weights come in, for tuning:
+        (letters, features) when it would pick the best of `letters` by EIG,
+        with their letters x EIG_FEATURES matrix, else ([guess], None) for a
+        guess that doesn't depend on the weights ([] for "reset").
+        """
+        state = state or self.state
+        guessed = self._normalize_guessed(guessedLetters)
+        words_state = self._split_state(currentWordState)
+
+        table_letter = self._table_guess(words_state, guessed)
+        if table_letter:
+            return [table_letter], None
+
+        per_word = self._candidates_for_state(words_state, guessed, state)
+        forced_letter = self._single_candidate_letter(per_word, guessed)
+        if forced_letter:
+            return [forced_letter], None
+
+        constrained = self._constrained_words(per_word)
+        if constrained:
+            _, wpat, ids = min(constrained, key=lambda t: len(t[2]))
+            chars = self.dictionary.matrix(len(wpat))[ids]
+            if "_" in wpat and len(chars):
+                present = {chr(c) for c in np.flatnonzero(np.bincount(chars.ravel(), minlength=128))}
+                letters = self._eig_letters(present, guessed)
+                if letters:
+                    bucket_sums = self._eig_bucket_sums(wpat, chars, letters)
+                    return letters, self._eig_features(wpat, letters, bucket_sums, len(chars))
+
+        guess = self._fallback_guess(words_state, constrained, guessed)["nextGuess"]
+        return ([guess] if guess else []), None
+
+    def get_next_guess_batch(self, states):
+        """
+        Next guesses for many independent games at once. `states` is a list of
+        (currentWordState, guessedLetters, guessesRemaining) tuples; returns one
+        output per state, the same as get_next_guess gives for a fresh game.
+        Identical states are answered once, each distinct (word pattern,
+        guessed letters) is filtered once, and EIG runs as one vectorized pass
+        per word length over every state that needs it.
+        """
+        outputs = [None] * len(states)
+        pending = {}  # (words_state, guessed) -> indexes into states
+        for i, (currentWordState, guessedLetters, _) in enumerate(states):
+            guessed = frozenset(self._normalize_guessed(guessedLetters))
+            words_state = tuple(self._split_state(currentWordState))
+            table_letter = self._table_guess(words_state, guessed)
+            if table_letter:
+                outputs[i] = {"nextGuess": table_letter, "status": "playing"}
+            else:
+                pending.setdefault((words_state, guessed), []).append(i)
+
+        filtered = {}    # (word pattern, guessed) -> candidate ids
+        decided = {}     # state key -> output
+        eig_words = {}   # state key -> (word pattern, guessed) for EIG
+        eig_jobs = {}    # length -> {(word pattern, guessed): candidate ids}
+        for key in pending:
+            words_state, guessed = key
+            per_word = []
+            for wpat in words_state:
+                if (wpat, guessed) not in filtered:
+                    filtered[(wpat, guessed)] = self.dictionary.filter_ids(wpat, guessed)
+                per_word.append((wpat, filtered[(wpat, guessed)]))
+
+            forced_letter = self._single_candidate_letter(per_word, guessed)
+            if forced_letter:
+                decided[key] = {"nextGuess": forced_letter, "status": "playing"}
+                continue
+            constrained = self._constrained_words(per_word)
+            if constrained:
+                _, wpat, ids = min(constrained, key=lambda t: len(t[2]))
+                eig_words[key] = (wpat, guessed)
+                eig_jobs.setdefault(len(wpat), {})[(wpat, guessed)] = ids
+            else:
+                decided[key] = self._fallback_guess(words_state, constrained, guessed)
+
+        eig_letters = {}
+        for length, jobs in eig_jobs.items():
+            eig_letters.update(self._eig_batch(length, jobs))
+        for key, job in eig_words.items():
+            eig_letter = eig_letters[job]
+            words_state, guessed = key
+            if eig_letter and eig_letter not in guessed:
+                decided[key] = {"nextGuess": eig_letter, "status": "playing"}
+            else:
+                per_word = [(wpat, filtered[(wpat, guessed)]) for wpat in words_state]
+                decided[key] = self._fallback_guess(list(words_state), self._constrained_words(per_word), guessed)
+
+        for key, indexes in pending.items():
+            for i in indexes:
+                outputs[i] = dict(decided[key])
+        return outputs
+
+def default_snapshot_path(airline_dict_path):
+    """Where the CLI and the offline tools keep the snapshot: next to the dictionary."""
+    return os.path.join(os.path.dirname(airline_dict_path), "solver_snapshot.bin")
+
 def update_pattern(hidden_word, current_pattern, guess):
     """Reveals guessed letters in the current pattern based on the hidden word."""
     new_pattern = []
@@ -354,21 +915,107 @@ def update_pattern(hidden_word, current_pattern, guess):
             new_pattern.append("_")
     return "".join(new_pattern)
 
+def play_game(solver, hidden_word, pattern=None, guessedLetters=None, guessesRemaining=6):
+    """
+    Auto-play one game against `hidden_word`, from a blank pattern unless a
+    state is given. Returns the auto-mode result: history, final pattern and
+    "success"/"failed".
+    """
+    if pattern is None:
+        pattern = "".join("_" if c != " " else " " for c in hidden_word)
+    guessedLetters = list(guessedLetters or [])
+
+    solver.reset()
+    history = []
+    while "_" in pattern and guessesRemaining > 0:
+        output = solver.get_next_guess(pattern, guessedLetters, guessesRemaining)
+        guess = output["nextGuess"]
+
+        if not guess:
+            history.append({"nextGuess": "", "status": "reset"})
+            break
+
+        guessedLetters.append(guess)
+
+        if guess in hidden_word.lower():
+            pattern = update_pattern(hidden_word.lower(), pattern, guess)
+        else:
+            guessesRemaining -= 1
+
+        history.append({"pattern": pattern, "guess": guess, "remaining": guessesRemaining})
+
+    return {
+        "history": history,
+        "finalPattern": pattern,
+        "hiddenWord": hidden_word,
+        "status": "success" if "_" not in pattern else "failed"
+    }
+
+def stream_response(solver, request):
+    """
+    Answer one --stream request. Requests with a hiddenWord are played to the
+    end; others get the next guess for their state. The request's id is
+    echoed back so callers can interleave games.
+    """
+    response = {"id": request.get("id")}
+    hidden_word = request.get("hiddenWord")
+    pattern = request.get("currentWordState")
+    guessedLetters = request.get("guessedLetters", [])
+    guessesRemaining = request.get("guessesRemaining", 6)
+
+    if hidden_word:
+        response.update(play_game(solver, hidden_word, pattern, guessedLetters, guessesRemaining))
+    elif pattern is None:
+        response["error"] = "currentWordState or hiddenWord required"
+    elif "_" not in pattern or guessesRemaining <= 0:
+        response.update({"nextGuess": "", "status": "reset"})
+    else:
+        response.update(solver.get_next_guess(pattern, guessedLetters, guessesRemaining))
+    return response
+
 def ensure_nltk_words():
     """
     Ensure that the NLTK 'words' corpus is available.
     If not, download it automatically.
     """
-    ensure_nltk_words()
+    import nltk
     try:
         from nltk.corpus import words
         _ = words.words()[:10]  # try accessing to confirm availability
     except LookupError:
-        print("🔽 NLTK 'words' corpus not found. Downloading...")
+        print("🔽 NLTK 'words' corpus not found. Downloading...", file=sys.stderr)
         nltk.download("words")
         from nltk.corpus import words
         _ = words.words()[:10]
-        print("✅ NLTK 'words' corpus downloaded successfully.")
+        print("✅ NLTK 'words' corpus downloaded successfully.", file=sys.stderr)
+
+def refresh_english_words(path=DEFAULT_ENGLISH_WORDS):
+    """
+    Rewrite the English word file from the NLTK 'words' corpus, one lowercase
+    word per line. This is the only place nltk is imported. Solvers starting
+    at once may all do this; each writes its own temp file and the last
+    rename wins.
+    """
+    ensure_nltk_words()
+    from nltk.corpus import words as nltk_words
+
+    word_set = {w.lower() for w in nltk_words.words() if w.isalpha()}
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)),
+                                    prefix=os.path.basename(path) + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8", newline="\n") as f:
+            f.write("\n".join(sorted(word_set)) + "\n")
+        os.chmod(tmp_path, 0o644)  # mkstemp creates it private
+        try:
+            os.replace(tmp_path, path)
+        except PermissionError:
+            # Windows: another process has the file open, so it was written already
+            if not os.path.exists(path):
+                raise
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    print(f"Wrote {len(word_set)} English words to {path}", file=sys.stderr)
 
 
 if __name__ == "__main__":
@@ -378,15 +1025,107 @@ if __name__ == "__main__":
         action="store_true",
         help="Enable auto-play until solved or guesses run out (requires hiddenWord in input JSON)"
     )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Serve many id-tagged games over NDJSON on stdin/stdout (see README)"
+    )
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="Run the local HTTP/JSON solver service instead of reading stdin (see README)"
+    )
+    parser.add_argument("--host", type=str, default="127.0.0.1", help="Address for --serve")
+    parser.add_argument("--port", type=int, default=8765, help="Port for --serve (0 picks a free one)")
+    parser.add_argument("--workers", type=int, default=4, help="Scoring threads for --serve")
+    parser.add_argument("--max-sessions", type=int, default=10000, help="Sessions kept by --serve before LRU eviction")
+    parser.add_argument("--session-ttl", type=float, default=900.0, help="Seconds an idle --serve session is kept")
+    parser.add_argument("--max-session-mb", type=float, default=256.0,
+                        help="Candidate memory kept across all --serve sessions before LRU eviction")
     parser.add_argument(
         "--dict", "-d",
         type=str,
         default="C:\\Users\\USER\\Desktop\\IndigoProject\\data\\airlines_unique_words.txt",
         help="Path to airline dictionary"
     )
+    parser.add_argument(
+        "--words", "-w",
+        type=str,
+        default=None,
+        help="General English word file, one word per line (default: data/english_words.txt next to this script)"
+    )
+    parser.add_argument(
+        "--refresh-words",
+        action="store_true",
+        help="Rebuild the English word file from the NLTK 'words' corpus before starting"
+    )
+    parser.add_argument(
+        "--book", "-b",
+        type=str,
+        default=None,
+        help="Opening book from build_opening_book.py (default: opening_book.json next to the dictionary, if present)"
+    )
+    parser.add_argument(
+        "--policy", "-p",
+        type=str,
+        default=None,
+        help="Serve single words from a policy built by build_policy.py; live computation is the fallback"
+    )
+    parser.add_argument(
+        "--affix-table",
+        type=str,
+        default=None,
+        help="Mined affix table from mine_affixes.py, added on top of the hand-written affix rules"
+    )
+    parser.add_argument(
+        "--snapshot", "-s",
+        type=str,
+        default=None,
+        help="Memory-mapped solver snapshot (default: solver_snapshot.bin next to the dictionary); rebuilt when the dictionaries change"
+    )
+    parser.add_argument(
+        "--no-snapshot",
+        action="store_true",
+        help="Always build the solver from the dictionaries and don't write a snapshot"
+    )
     args = parser.parse_args()
 
-    solver = HangmanSolver(airline_dict_path=args.dict)
+    snapshot_path = None
+    if not args.no_snapshot:
+        snapshot_path = args.snapshot or default_snapshot_path(args.dict)
+
+    if args.refresh_words:
+        refresh_english_words(args.words or DEFAULT_ENGLISH_WORDS)
+
+    book_path = args.book
+    if book_path is None:
+        default_book = os.path.join(os.path.dirname(args.dict), "opening_book.json")
+        book_path = default_book if os.path.exists(default_book) else None
+
+    solver = HangmanSolver(airline_dict_path=args.dict, opening_book_path=book_path, policy_path=args.policy,
+                           affix_table_path=args.affix_table, snapshot_path=snapshot_path,
+                           english_words_path=args.words)
+
+    if args.serve:
+        from solver_server import serve
+        serve(solver, args.host, args.port, args.workers, max_sessions=args.max_sessions,
+              session_ttl=args.session_ttl, max_session_bytes=int(args.max_session_mb * (1 << 20)))
+        sys.exit(0)
+
+    if args.stream:
+        # one JSON object per line in both directions, flushed per response
+        print(json.dumps({"status": "ready"}), flush=True)
+        for line in sys.stdin:
+            if not line.strip():
+                continue
+            request = None
+            try:
+                request = json.loads(line)
+                response = stream_response(solver, request)
+            except Exception as e:
+                response = {"id": request.get("id") if isinstance(request, dict) else None, "error": str(e)}
+            print(json.dumps(response), flush=True)
+        sys.exit(0)
 
     print("Hangman Solver ready.")
     print("Example input (auto mode):")
@@ -412,30 +1151,7 @@ if __name__ == "__main__":
                     print(json.dumps({"error": "hiddenWord required in auto mode"}))
                     continue
 
-                history = []
-                while "_" in pattern and guessesRemaining > 0:
-                    output = solver.get_next_guess(pattern, guessedLetters, guessesRemaining)
-                    guess = output["nextGuess"]
-
-                    if not guess:
-                        history.append({"nextGuess": "", "status": "reset"})
-                        break
-
-                    guessedLetters.append(guess)
-
-                    if guess in hidden_word.lower():
-                        pattern = update_pattern(hidden_word.lower(), pattern, guess)
-                    else:
-                        guessesRemaining -= 1
-
-                    history.append({"pattern": pattern, "guess": guess, "remaining": guessesRemaining})
-
-                print(json.dumps({
-                    "history": history,
-                    "finalPattern": pattern,
-                    "hiddenWord": hidden_word,
-                    "status": "success" if "_" not in pattern else "failed"
-                }))
+                print(json.dumps(play_game(solver, hidden_word, pattern, guessedLetters, guessesRemaining)))
 
         except Exception as e:
             print(json.dumps({"error": str(e)}))
\ No newline at end of file
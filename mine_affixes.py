@@ -0,0 +1,61 @@
+import argparse
+import time
+import numpy as np
+from hangman_v4 import HangmanSolver, AFFIX_TABLE_VERSION
+
+def mine_affixes(words, max_fragment=3):
+    """
+    Count, for every head/tail fragment with one blank, which letter fills the
+    blank. Fragment keys (k = 1..max_fragment known letters):
+      "^pre_"  word starts with "pre", blank at position 3
+      "_ing$"  word ends with "ing", blank just before it
+      "ti_$"   word ends with "ti" + one letter, blank is the last letter
+    Returns {fragment: 26 counts}.
+    """
+    counts = {}
+
+    def add(fragment, letter):
+        if "a" <= letter <= "z":
+            row = counts.get(fragment)
+            if row is None:
+                row = counts[fragment] = np.zeros(26, dtype=np.int64)
+            row[ord(letter) - ord("a")] += 1
+
+    for w in words:
+        for k in range(1, max_fragment + 1):
+            if len(w) <= k:
+                break
+            add("^" + w[:k] + "_", w[k])
+            add("_" + w[-k:] + "$", w[-k - 1])
+            add(w[-k - 1:-1] + "_$", w[-1])
+    return counts
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dict", "-d", type=str, required=True, help="Airline dictionary path")
+    parser.add_argument("--max-fragment", type=int, default=3, help="Known letters per fragment")
+    parser.add_argument("--min-support", type=int, default=50, help="Drop fragments seen in fewer words")
+    parser.add_argument("--out", "-o", type=str, default="data/affix_table.npz", help="Output table path")
+    args = parser.parse_args()
+
+    start = time.time()
+    # same merged vocabulary the solver uses (NLTK words + airline dictionary)
+    solver = HangmanSolver(airline_dict_path=args.dict)
+    counts = mine_affixes(solver.word_list, max_fragment=args.max_fragment)
+
+    fragments = sorted(f for f, row in counts.items() if row.sum() >= args.min_support)
+    support = np.array([counts[f].sum() for f in fragments], dtype=np.int32)
+    probs = np.array([counts[f] for f in fragments], dtype=np.float32) / support[:, None]
+
+    np.savez_compressed(
+        args.out,
+        version=np.int32(AFFIX_TABLE_VERSION),
+        max_fragment=np.int32(args.max_fragment),
+        fragments=np.array(fragments, dtype=str),
+        support=support,
+        probs=probs.astype(np.float16),
+    )
+    print(f"Wrote {len(fragments)} of {len(counts)} fragments to {args.out} in {time.time() - start:.1f}s")
+
+if __name__ == "__main__":
+    main()
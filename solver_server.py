@@ -0,0 +1,311 @@
+import asyncio
+import json
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+MAX_BODY = 4 << 20  # batch requests carry many states
+REASONS = {
+    200: "OK",
+    201: "Created",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+}
+
+class HttpError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+class Session:
+    """One game played through the server: its solver state, one request at a time."""
+
+    def __init__(self, session_id, state, now):
+        self.id = session_id
+        self.state = state
+        self.lock = asyncio.Lock()
+        self.last_used = now
+        self.nbytes = 0  # candidate memory as of the last accounting
+
+class SessionStore:
+    """
+    Sessions in least-recently-used order, bounded by count, idle time (TTL)
+    and the total bytes of candidates they keep between turns. Evicting a
+    session only loses speed: a guess for an unknown session id starts a
+    fresh session, which rebuilds its candidates from the currentWordState
+    and guessedLetters the client sends.
+    Only used from the event loop thread, so it needs no locking.
+    """
+
+    def __init__(self, solver, max_sessions=10000, ttl=900.0, max_bytes=256 << 20, clock=time.monotonic):
+        self.solver = solver
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.clock = clock
+        self._sessions = OrderedDict()
+        self.nbytes = 0
+        self.evicted = 0
+        self.rebuilt = 0
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def create(self, session_id=None):
+        """Start a session and return it, evicting others to stay within bounds."""
+        session = Session(session_id or uuid.uuid4().hex, self.solver.new_state(), self.clock())
+        self._sessions[session.id] = session
+        self._evict()
+        return session
+
+    def get(self, session_id):
+        """The session with that id, marked as just used; None if there isn't one."""
+        self._expire()
+        session = self._sessions.get(session_id)
+        if session is not None:
+            session.last_used = self.clock()
+            self._sessions.move_to_end(session_id)
+        return session
+
+    def get_or_rebuild(self, session_id):
+        """Like get(), but an unknown (e.g. evicted) id gets a fresh session."""
+        session = self.get(session_id)
+        if session is None:
+            self.rebuilt += 1
+            session = self.create(session_id)
+        return session
+
+    def delete(self, session_id):
+        session = self._sessions.pop(session_id, None)
+        if session is not None:
+            self.nbytes -= session.nbytes
+        return session is not None
+
+    def account(self, session):
+        """Re-measure a session's candidates after a guess and evict to fit the budget."""
+        if self._sessions.get(session.id) is not session:
+            return  # evicted while its guess was computed
+        nbytes = session.state.nbytes()
+        self.nbytes += nbytes - session.nbytes
+        session.nbytes = nbytes
+        self._evict()
+
+    def stats(self):
+        self._expire()
+        return {"sessions": len(self._sessions), "candidateBytes": self.nbytes,
+                "evicted": self.evicted, "rebuilt": self.rebuilt}
+
+    def _expire(self):
+        """Drop sessions idle for longer than the TTL (they sit at the LRU end)."""
+        deadline = self.clock() - self.ttl
+        while self._sessions:
+            session = next(iter(self._sessions.values()))
+            if session.last_used > deadline:
+                break
+            self._drop(session)
+
+    def _evict(self):
+        """Drop least recently used sessions until count and bytes are within bounds."""
+        self._expire()
+        # the most recent session stays even if it alone is over the budget
+        while len(self._sessions) > 1 and (len(self._sessions) > self.max_sessions or self.nbytes > self.max_bytes):
+            self._drop(next(iter(self._sessions.values())))
+
+    def _drop(self, session):
+        del self._sessions[session.id]
+        self.nbytes -= session.nbytes
+        self.evicted += 1
+
+class SolverServer:
+    """
+    Local HTTP/JSON front end for one shared HangmanSolver.
+      GET    /health               -> {"status": "ok", "sessions": n, ...store stats}
+      POST   /guess                -> next guess for a game state, no session
+      POST   /guess/batch          -> {"guesses": [...]} for {"states": [...]}
+      POST   /sessions             -> {"sessionId": id}
+      POST   /sessions/<id>/guess  -> next guess, narrowed from the session's last turn
+      DELETE /sessions/<id>        -> {"deleted": true}
+    Guess bodies are the same JSON as the stdin protocol (currentWordState,
+    guessedLetters, guessesRemaining) and so are the answers. Scoring runs on
+    a thread pool so the event loop keeps accepting requests; every game has
+    its own GameState, so the solver's dictionary and priors are only read.
+    Sessions live in a SessionStore; a guess for an evicted session rebuilds
+    it from the request.
+    """
+
+    def __init__(self, solver, workers=4, store=None):
+        self.solver = solver
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.sessions = store if store is not None else SessionStore(solver)
+
+    async def start(self, host="127.0.0.1", port=8765):
+        """Start listening (port 0 picks a free port) and return the asyncio server."""
+        return await asyncio.start_server(self._handle_connection, host, port)
+
+    async def serve(self, host="127.0.0.1", port=8765):
+        server = await self.start(host, port)
+        host, port = server.sockets[0].getsockname()[:2]
+        print(f"Hangman Solver serving on http://{host}:{port}", flush=True)
+        async with server:
+            await server.serve_forever()
+
+    # ---------- HTTP ----------
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request = await self._read_request(reader)
+                    if request is None:
+                        break
+                    method, target, body, keep_alive = request
+                    status, payload = await self._dispatch(method, target, body)
+                except HttpError as e:
+                    status, payload, keep_alive = e.status, {"error": e.message}, False
+                self._write_response(writer, status, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _read_request(self, reader):
+        """(method, target, body, keep_alive) of the next request, or None at EOF."""
+        line = await reader.readline()
+        if not line:
+            return None
+        try:
+            method, target, version = line.decode("latin-1").split()
+        except ValueError:
+            raise HttpError(400, "Malformed request line")
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        try:
+            length = int(headers.get("content-length", 0))
+        except ValueError:
+            raise HttpError(400, "Bad Content-Length")
+        if length < 0:
+            raise HttpError(400, "Bad Content-Length")
+        if length > MAX_BODY:
+            raise HttpError(413, "Request body too large")
+        body = await reader.readexactly(length) if length else b""
+
+        connection = headers.get("connection", "").lower()
+        keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+        return method.upper(), target, body, keep_alive
+
+    def _write_response(self, writer, status, payload, keep_alive):
+        data = json.dumps(payload).encode("utf-8")
+        head = (f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+                f"Content-Type: application/json\r\n"
+                f"Content-Length: {len(data)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode("latin-1") + data)
+
+    # ---------- Routes ----------
+    async def _dispatch(self, method, target, body):
+        parts = [p for p in urlsplit(target).path.split("/") if p]
+        try:
+            if parts == ["health"]:
+                self._allow(method, "GET")
+                return 200, dict(status="ok", **self.sessions.stats())
+            if parts == ["guess"]:
+                self._allow(method, "POST")
+                return 200, await self._guess(body, self.solver.new_state())
+            if parts == ["guess", "batch"]:
+                self._allow(method, "POST")
+                return 200, await self._guess_batch(body)
+            if parts == ["sessions"]:
+                self._allow(method, "POST")
+                return 201, {"sessionId": self.sessions.create().id}
+            if len(parts) == 3 and parts[0] == "sessions" and parts[2] == "guess":
+                self._allow(method, "POST")
+                session = self.sessions.get_or_rebuild(parts[1])
+                async with session.lock:
+                    output = await self._guess(body, session.state)
+                self.sessions.account(session)
+                return 200, dict(sessionId=session.id, **output)
+            if len(parts) == 2 and parts[0] == "sessions":
+                self._allow(method, "DELETE")
+                if not self.sessions.delete(parts[1]):
+                    raise HttpError(404, f"No session {parts[1]}")
+                return 200, {"deleted": True}
+            raise HttpError(404, "No such endpoint")
+        except HttpError as e:
+            return e.status, {"error": e.message}
+        except Exception as e:
+            return 500, {"error": str(e)}
+
+    def _allow(self, method, allowed):
+        if method != allowed:
+            raise HttpError(405, f"Use {allowed}")
+
+    def _parse_json(self, body):
+        try:
+            request = json.loads(body or b"{}")
+        except ValueError:
+            raise HttpError(400, "Body must be JSON")
+        if not isinstance(request, dict):
+            raise HttpError(400, "Body must be a JSON object")
+        return request
+
+    def _parse_state(self, request):
+        """(currentWordState, guessedLetters, guessesRemaining) of a guess request."""
+        pattern = request.get("currentWordState")
+        guessedLetters = request.get("guessedLetters", [])
+        guessesRemaining = request.get("guessesRemaining", 6)
+        # bool is an int subclass, so "guessesRemaining": true would pass as 1
+        if (not isinstance(pattern, str) or not isinstance(guessedLetters, list)
+                or not isinstance(guessesRemaining, int) or isinstance(guessesRemaining, bool)):
+            raise HttpError(400, "Expected currentWordState (string), guessedLetters (list), guessesRemaining (int)")
+        if not all(isinstance(g, str) for g in guessedLetters):
+            raise HttpError(400, "guessedLetters must be strings")
+        return pattern, guessedLetters, guessesRemaining
+
+    async def _guess(self, body, state):
+        """Run get_next_guess for the state in `body` on the worker pool."""
+        pattern, guessedLetters, guessesRemaining = self._parse_state(self._parse_json(body))
+        if "_" not in pattern or guessesRemaining <= 0:
+            return {"nextGuess": "", "status": "reset"}
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self.solver.get_next_guess,
+                                          pattern, guessedLetters, guessesRemaining, state)
+
+    async def _guess_batch(self, body):
+        """Run get_next_guess_batch for the {"states": [...]} in `body` on the worker pool."""
+        states = self._parse_json(body).get("states")
+        if not isinstance(states, list) or not all(isinstance(st, dict) for st in states):
+            raise HttpError(400, "Expected states (list of guess requests)")
+        states = [self._parse_state(st) for st in states]
+
+        outputs = [{"nextGuess": "", "status": "reset"}] * len(states)
+        playing = [i for i, (pattern, _, remaining) in enumerate(states) if "_" in pattern and remaining > 0]
+        loop = asyncio.get_running_loop()
+        guesses = await loop.run_in_executor(self.executor, self.solver.get_next_guess_batch,
+                                             [states[i] for i in playing])
+        for i, output in zip(playing, guesses):
+            outputs[i] = output
+        return {"guesses": outputs}
+
+def serve(solver, host="127.0.0.1", port=8765, workers=4, max_sessions=10000, session_ttl=900.0,
+          max_session_bytes=256 << 20):
+    """Serve `solver` over HTTP until interrupted."""
+    store = SessionStore(solver, max_sessions=max_sessions, ttl=session_ttl, max_bytes=max_session_bytes)
+    try:
+        asyncio.run(SolverServer(solver, workers, store).serve(host, port))
+    except KeyboardInterrupt:
+        pass
@@ -26,32 +26,42 @@ TEST_WORDS = [
     "base maintenance"
 ]
 
-def run_solver(word, solver_path):
+def start_solver(solver_path):
+    """Start one long-lived solver in --stream mode and wait until it is ready."""
+    proc = subprocess.Popen(
+        ["python", solver_path, "--stream"],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        text=True
+    )
+    if not proc.stdout.readline():  # {"status": "ready"}
+        raise RuntimeError("Solver exited before it was ready")
+    return proc
+
+def run_solver(word, proc, game_id):
     # Build initial masked state
     pattern = "".join("_" if c != " " else " " for c in word)
     input_json = {
+        "id": game_id,
         "hiddenWord": word,
         "currentWordState": pattern,
         "guessedLetters": [],
         "guessesRemaining": 6
     }
 
-    # Run solver in auto mode
-    proc = subprocess.Popen(
-        ["python", solver_path, "--auto"],
-        stdin=subprocess.PIPE,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        text=True
-    )
-    out, err = proc.communicate(json.dumps(input_json) + "\n")
-    if err:
-        print("Error:", err)
+    # Play the game on the warm solver: one request line, one result line
+    proc.stdin.write(json.dumps(input_json) + "\n")
+    proc.stdin.flush()
+    out = proc.stdout.readline()
     try:
-        return json.loads(out.strip().split("\n")[-1])  # last JSON line
+        res = json.loads(out)
     except Exception as e:
         print("Parse error:", out)
         return None
+    if "error" in res:
+        print("Error:", res["error"])
+        return None
+    return res
 
 def summarize(results):
     total = len(results)
@@ -78,14 +88,17 @@ if __name__ == "__main__":
     else:
         solver_path = sys.argv[1]
 
+    proc = start_solver(solver_path)
     results = []
-    for w in TEST_WORDS:
-        res = run_solver(w, solver_path)
+    for game_id, w in enumerate(TEST_WORDS):
+        res = run_solver(w, proc, game_id)
         results.append(res)
         if res:
             print(f"Word: {w:20} -> {res['status']} in {len(res['history'])} guesses")
         else:
             print(f"Word: {w:20} -> ERROR")
+    proc.stdin.close()
+    proc.wait()
 
     stats = summarize(results)
     print("\n=== SUMMARY ===")